@@ -0,0 +1,170 @@
+"""
+Local HTTP server serving a synthetic site, so SEOAnalyzer can be benchmarked
+without touching the network. Every page, link and asset is generated from a
+seed, so runs with the same settings see the same site.
+"""
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "search engine optimization content keyword ranking page speed mobile link "
+    "image title description canonical schema crawler index sitemap robots "
+    "performance audit traffic visitor conversion product article blog header "
+    "marketing analytics domain authority backlink structure quality fresh"
+).split()
+
+
+class SyntheticSite:
+    """
+    Description of the generated site: how many pages, how many links and
+    assets each page has, and which share of links are broken or slow.
+    """
+
+    def __init__(self, pages=50, links_per_page=20, assets_per_page=10, words_per_page=500,
+                 broken_ratio=0.1, slow_ratio=0.05, slow_delay=0.2, asset_size=20 * 1024, seed=0):
+        self.pages = pages
+        self.links_per_page = links_per_page
+        self.assets_per_page = assets_per_page
+        self.words_per_page = words_per_page
+        self.broken_ratio = broken_ratio
+        self.slow_ratio = slow_ratio
+        self.slow_delay = slow_delay
+        self.asset_size = asset_size
+        self.seed = seed
+
+    def page_path(self, number):
+        return "/" if number == 0 else f"/page{number}"
+
+    def links(self, number):
+        rng = random.Random(self.seed * 100003 + number)
+        links = []
+        for i in range(self.links_per_page):
+            roll = rng.random()
+            if roll < self.broken_ratio:
+                links.append(f"/broken{number}-{i}")
+            elif roll < self.broken_ratio + self.slow_ratio:
+                links.append(f"/slow{number}-{i}")
+            else:
+                links.append(self.page_path(rng.randrange(self.pages)))
+        return links
+
+    def assets(self, number):
+        kinds = ("css", "js", "png")
+        return [f"/assets/{number}-{i}.{kinds[i % 3]}" for i in range(self.assets_per_page)]
+
+    def render_page(self, number):
+        rng = random.Random(self.seed * 7919 + number)
+        paragraphs = []
+        words = [rng.choice(WORDS) for _ in range(self.words_per_page)]
+        for start in range(0, len(words), 50):
+            paragraphs.append(f"<p>{' '.join(words[start:start + 50]).capitalize()}.</p>")
+
+        head = [
+            f"<title>Synthetic page {number}</title>",
+            '<meta name="viewport" content="width=device-width, initial-scale=1">',
+            f'<meta name="description" content="Synthetic page {number} for benchmarks">',
+            f'<link rel="canonical" href="{self.page_path(number)}">',
+            f'<meta property="og:image" content="/assets/{number}-og.png">',
+        ]
+        body = [f"<h1>Page {number}</h1>"]
+        for asset in self.assets(number):
+            if asset.endswith(".css"):
+                head.append(f'<link rel="stylesheet" href="{asset}">')
+            elif asset.endswith(".js"):
+                head.append(f'<script src="{asset}"></script>')
+            else:
+                body.append(f'<img src="{asset}" alt="">')
+        body.extend(paragraphs)
+        body.append("<ul>" + "".join(f'<li><a href="{link}">{link}</a></li>' for link in self.links(number)) + "</ul>")
+        return f"<!DOCTYPE html><html><head>{''.join(head)}</head><body>{''.join(body)}</body></html>"
+
+    def sitemap(self, base_url):
+        locs = "".join(f"<url><loc>{base_url.rstrip('/')}{self.page_path(n)}</loc></url>" for n in range(self.pages))
+        return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locs}</urlset>'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like a real server
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def _respond(self, send_body):
+        site = self.server.site
+        path = self.path.split("?", 1)[0]
+
+        if path.startswith("/slow"):
+            time.sleep(site.slow_delay)
+            status, content_type, body = 200, "text/html", b"<html><body>slow</body></html>"
+        elif path.startswith("/broken"):
+            status, content_type, body = 404, "text/html", b"<html><body>not found</body></html>"
+        elif path == "/robots.txt":
+            status, content_type, body = 200, "text/plain", b"User-agent: *\nDisallow: /private\n"
+        elif path == "/sitemap.xml":
+            base_url = f"http://{self.headers.get('Host')}"
+            status, content_type, body = 200, "application/xml", site.sitemap(base_url).encode()
+        elif path.startswith("/assets/"):
+            content_type = {"css": "text/css", "js": "application/javascript"}.get(path.rsplit(".", 1)[-1], "image/png")
+            status, body = 200, b"x" * site.asset_size
+        else:
+            number = 0 if path == "/" else path[len("/page"):]
+            if isinstance(number, str) and not (number.isdigit() and int(number) < site.pages):
+                status, content_type, body = 404, "text/html", b"<html><body>not found</body></html>"
+            else:
+                status, content_type, body = 200, "text/html; charset=utf-8", site.render_page(int(number)).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+class FixtureServer:
+    """
+    Serve a SyntheticSite on 127.0.0.1 from a background thread:
+
+        with FixtureServer(SyntheticSite(pages=100)) as server:
+            analyzer.analyze_page_speed(server.url)
+    """
+
+    def __init__(self, site, host="127.0.0.1", port=0):
+        self.site = site
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.site = site
+        self.url = f"http://{host}:{self.httpd.server_address[1]}/"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    server = FixtureServer(SyntheticSite()).start()
+    print(f"Serving synthetic site at {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,173 @@
+"""
+Offline benchmarks for SEOAnalyzer against a local synthetic site.
+
+    python benchmarks/run_benchmarks.py --pages 100 --links 30 --assets 12
+    python benchmarks/run_benchmarks.py --only keyword_density --json results.json
+
+Each benchmark reports throughput, latency percentiles and peak Python heap
+usage (from a separate tracemalloc run, so tracing does not skew timings).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import FixtureServer, SyntheticSite  # noqa: E402
+from seoanalyzer import LinkStatusCache, PageCache, ParsedPage, SEOAnalyzer, SiteCrawler  # noqa: E402
+
+
+def bench_page_analysis(analyzer, server, samples):
+    latencies = []
+    for number in range(samples):
+        url = server.url.rstrip("/") + server.site.page_path(number % server.site.pages)
+        analyzer.link_cache = LinkStatusCache()  # Measure cold link checks
+        analyzer.page_cache = PageCache()  # and a cold page analysis
+        start = time.perf_counter()
+        analyzer.analyze_page_speed(url)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_link_checks(analyzer, server, samples):
+    base = server.url.rstrip("/")
+    latencies = []
+    for number in range(samples):
+        urls = [base + link for link in server.site.links(number % server.site.pages)]
+        analyzer.link_cache = LinkStatusCache()
+        start = time.perf_counter()
+        analyzer.check_broken_internal_links("".join(f'<a href="{url}"></a>' for url in urls), server.url)
+        analyzer.check_broken_links(urls)
+        analyzer.analyze_404_errors(urls)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_keyword_density(analyzer, server, samples):
+    html = [server.site.render_page(number % server.site.pages) for number in range(samples)]
+    latencies = []
+    for content in html:
+        page = ParsedPage(content, server.url)  # Fresh page, so nothing is cached
+        start = time.perf_counter()
+        analyzer.analyze_keyword_density(page)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_keyword_corpus(analyzer, server, samples):
+    pages = [ParsedPage(server.site.render_page(number % server.site.pages), server.url + str(number))
+             for number in range(samples)]
+    start = time.perf_counter()
+    corpus = analyzer.build_keyword_corpus(pages)
+    corpus.site_keywords()
+    corpus.cannibalization()
+    return [(time.perf_counter() - start) / samples] * samples  # Per page, amortized over the batch
+
+
+def bench_crawl(analyzer, server, samples):
+    analyzer.link_cache = LinkStatusCache()
+    analyzer.page_cache = PageCache()
+    crawler = SiteCrawler(analyzer, max_pages=samples, max_depth=samples, max_workers=8, delay=0)
+    latencies = []
+    start = time.perf_counter()
+    for _ in crawler.crawl(server.url):
+        now = time.perf_counter()
+        latencies.append(now - start)  # Time between consecutive finished pages
+        start = now
+    return latencies
+
+
+BENCHMARKS = {
+    "page_analysis": bench_page_analysis,
+    "link_checks": bench_link_checks,
+    "keyword_density": bench_keyword_density,
+    "keyword_corpus": bench_keyword_corpus,
+    "crawl": bench_crawl,
+}
+
+
+def run_benchmark(name, analyzer, server, samples, repeat):
+    benchmark = BENCHMARKS[name]
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        latencies.extend(benchmark(analyzer, server, samples))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    benchmark(analyzer, server, samples)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "Benchmark": name,
+        "Items": len(latencies),
+        "Total Time (seconds)": elapsed,
+        "Throughput (items/second)": len(latencies) / elapsed if elapsed else 0.0,
+        "p50 (ms)": float(np.percentile(latencies_ms, 50)) if len(latencies) else None,
+        "p95 (ms)": float(np.percentile(latencies_ms, 95)) if len(latencies) else None,
+        "p99 (ms)": float(np.percentile(latencies_ms, 99)) if len(latencies) else None,
+        "Peak Memory (MB)": peak / (1024 * 1024),
+    }
+
+
+def print_table(results):
+    columns = list(results[0])
+    rows = [
+        [f"{value:.2f}" if isinstance(value, float) else str(value) for value in result.values()]
+        for result in results
+    ]
+    widths = [max(len(cell) for cell in cells) for cells in zip(columns, *rows)]
+    for cells in [columns] + rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(cells, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SEOAnalyzer against a local synthetic site.")
+    parser.add_argument("--pages", type=int, default=50, help="pages on the synthetic site")
+    parser.add_argument("--links", type=int, default=20, help="links per page")
+    parser.add_argument("--assets", type=int, default=10, help="assets (css/js/images) per page")
+    parser.add_argument("--words", type=int, default=500, help="words of body text per page")
+    parser.add_argument("--broken", type=float, default=0.1, help="share of links that return 404")
+    parser.add_argument("--slow", type=float, default=0.05, help="share of links that respond slowly")
+    parser.add_argument("--slow-delay", type=float, default=0.2, help="seconds a slow link takes")
+    parser.add_argument("--samples", type=int, default=20, help="items per benchmark run")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--model", default="en_core_web_sm", help="spaCy model to load")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)  # Broken links are expected here
+    site = SyntheticSite(pages=args.pages, links_per_page=args.links, assets_per_page=args.assets,
+                         words_per_page=args.words, broken_ratio=args.broken, slow_ratio=args.slow,
+                         slow_delay=args.slow_delay)
+
+    results = []
+    cwd = os.getcwd()
+    # Checks write broken_links.txt to the working directory; keep it out of the repo
+    with tempfile.TemporaryDirectory() as workdir, FixtureServer(site) as server:
+        os.chdir(workdir)
+        try:
+            with SEOAnalyzer(nlp_model=args.model) as analyzer:
+                for name in args.only or BENCHMARKS:
+                    results.append(run_benchmark(name, analyzer, server, args.samples, args.repeat))
+        finally:
+            os.chdir(cwd)
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
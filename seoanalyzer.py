@@ -1,104 +1,1207 @@
 import requests 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json 
-import spacy 
-import matplotlib.pyplot as plt 
-from PIL import Image 
+import argparse
 from io import BytesIO 
-from sklearn.feature_extraction.text import CountVectorizer 
-from urllib.parse import urlparse 
+from urllib.parse import urlparse, urlsplit, urlunsplit
+from collections import OrderedDict
 import re 
 import logging 
 import time 
-from bs4 import BeautifulSoup 
+from bs4 import BeautifulSoup, NavigableString
 import os
-import numpy as np 
- 
-# Setup logging 
-logging.basicConfig(level=logging.INFO) 
+import sys
+import gzip
+import zlib
+import hashlib
+import codecs
+import html
+from html.parser import HTMLParser
+import sqlite3
+import threading
+import gc
+from functools import cached_property
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, ALL_COMPLETED, wait
+from urllib.robotparser import RobotFileParser
+from xml.etree import ElementTree
+from functools import partial
+import asyncio
+import heapq
+import contextvars
+from contextlib import contextmanager
+import random
+import weakref
+
+# spaCy, matplotlib, Pillow and NumPy are imported by the checks that use
+# them, so importing this module stays cheap for short-lived workers
+
+DEFAULT_USER_AGENT = "SEOAnalyzer/1.0 (+https://github.com/Amirreza-Jabbari/SEOAnalyzer)"
+DEFAULT_NLP_MODEL = "en_core_web_sm"
+NLP_MAX_LENGTH = 1000000  # Maximum length for spaCy
+HTML_CONTENT_TYPES = {'text/html', 'application/xhtml+xml'}
+FETCH_CHUNK_SIZE = 64 * 1024
+# Tags whose text never reaches the reader
+INVISIBLE_TAGS = {'script', 'style', 'noscript', 'template', 'head', 'title', 'svg'}
  
+class ParsedPage:
+    """
+    A fetched HTML page parsed once and shared by every check.
+    Views are computed lazily on first access and cached on the instance.
+    """
+
+    def __init__(self, html, url, site_url=None):
+        self.html = html
+        self.url = url
+        self.site_url = site_url or url  # Links under this prefix count as internal
+        self.nlp_results = None  # Filled in by SEOAnalyzer.process_text
+
+    @cached_property
+    def soup(self):
+        return BeautifulSoup(self.html, 'html.parser')
+
+    @cached_property
+    def text(self):
+        # Visible text only, so the NLP stage never sees markup
+        parts = []
+        for string in self.soup.find_all(string=True):
+            # Skip comments, doctypes and CDATA, which subclass NavigableString
+            if type(string) is not NavigableString:
+                continue
+            if any(parent.name in INVISIBLE_TAGS for parent in string.parents):
+                continue
+            parts.append(string)
+        return ' '.join(' '.join(parts).split())
+
+    @cached_property
+    def head(self):
+        # Metadata straight from the HTML, so head checks never build the soup
+        return PageHead(self.html)
+
+    @cached_property
+    def anchors(self):
+        return self.soup.find_all('a', href=True)
+
+    @cached_property
+    def links(self):
+        # (raw href, absolute URL) pairs for every anchor on the page; hrefs
+        # that are not valid URLs (e.g. "http://[bad") are skipped
+        links = []
+        for a in self.anchors:
+            try:
+                links.append((a['href'], resolve_url(a['href'], self.url)))
+            except ValueError:
+                logging.debug(f"Skipping invalid link {a['href']!r} on {self.url}")
+        return links
+
+    @cached_property
+    def internal_links(self):
+        return [href for href, absolute in self.links if absolute.startswith(self.site_url)]
+
+    @cached_property
+    def internal_urls(self):
+        # Absolute URLs of the internal links, in page order
+        return [absolute for _, absolute in self.links if absolute.startswith(self.site_url)]
+
+    @cached_property
+    def external_links(self):
+        netloc = urlparse(self.url).netloc
+        return [href for href, _ in self.links if urlparse(href).netloc != netloc]
+
+    @cached_property
+    def images(self):
+        return self.soup.find_all('img')
+
+    @cached_property
+    def headers(self):
+        headers = {'h1': [], 'h2': [], 'h3': []}
+        for tag in self.soup.find_all(list(headers)):
+            headers[tag.name].append(tag)
+        return headers
+
+    @cached_property
+    def link_tags(self):
+        return self.soup.find_all('link')
+
+    @cached_property
+    def script_tags(self):
+        return self.soup.find_all('script')
+
+
+def resolve_url(resource_url, base_url):
+    if urlparse(resource_url).netloc:
+        return resource_url
+    else:
+        return requests.compat.urljoin(base_url, resource_url)
+
+
+# One pass over the page picks up <meta>, <link>, <title>, every <script> (for
+# JSON-LD) and microdata itemtypes; comments are matched so they are skipped
+_TAG_ATTRIBUTES = r'((?:[^>"\']|"[^"]*"|\'[^\']*\')*)'
+HEAD_TAG_RE = re.compile(
+    r'<(?:(meta|link)\b' + _TAG_ATTRIBUTES + r'>'
+    r'|(!--)'
+    r'|(title|script)\b' + _TAG_ATTRIBUTES + r'>)'
+    r'|itemtype\s*=\s*["\']?https?://schema\.org/(\w+)',
+    re.IGNORECASE
+)
+# Ends of the elements opened above. They are searched for separately, as a
+# lazy match up to them would rescan the rest of the page for every element
+# left unclosed.
+CLOSING_TAG_RE = {
+    '!--': re.compile(r'-->'),
+    'title': re.compile(r'</title\s*>', re.IGNORECASE),
+    'script': re.compile(r'</script\s*>', re.IGNORECASE),
+}
+# <meta> attributes that name the value in content
+META_ATTRIBUTES = ('name', 'property', 'itemprop', 'http-equiv')
+ATTRIBUTE_RE = re.compile(r'([^\s"\'>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+)))?')
+
+
+def parse_attributes(source):
+    # {lowercased name: unescaped value} of a tag's attribute string
+    return {
+        match.group(1).lower(): html.unescape(next((value for value in match.group(2, 3, 4) if value is not None), ''))
+        for match in ATTRIBUTE_RE.finditer(source)
+    }
+
+
+class PageHead:
+    """
+    Metadata of a page: the title, <meta> values by attribute (name,
+    property, itemprop or http-equiv) and key, e.g. meta['name']['description']
+    (first occurrence wins), <link> hrefs by rel, the
+    parsed JSON-LD blocks and the schema.org types they (and any microdata)
+    declare. Built from a single scan of the HTML, without a DOM.
+    """
+
+    def __init__(self, html_content):
+        self.title = None
+        # Kept apart, as e.g. a product's itemprop="description" in the body
+        # is not the page's meta description
+        self.meta = {attribute: {} for attribute in META_ATTRIBUTES}
+        self.links = defaultdict(list)
+        self.json_ld = []
+        self.microdata_types = []
+        unclosed = set()  # Elements with no closing tag in the rest of the page
+        position = 0
+        while match := HEAD_TAG_RE.search(html_content, position):
+            position = match.end()
+            tag, attributes, comment, element, element_attributes, itemtype = match.groups()
+            if tag:
+                self._add_tag(tag.lower(), parse_attributes(attributes))
+            elif comment or element:
+                name = comment or element.lower()
+                end = None if name in unclosed else CLOSING_TAG_RE[name].search(html_content, position)
+                if end is None:
+                    unclosed.add(name)  # Read on as if the opening tag were not there
+                    continue
+                content = html_content[position:end.start()]
+                position = end.end()
+                if name == 'title':
+                    if self.title is None:
+                        self.title = html.unescape(content)
+                elif name == 'script':
+                    script_type = parse_attributes(element_attributes).get('type', '')
+                    if script_type.split(';')[0].strip().lower() == 'application/ld+json':
+                        self._add_json_ld(content)
+            elif itemtype:
+                self.microdata_types.append(itemtype)
+
+    def _add_tag(self, tag, attributes):
+        if tag == 'meta':
+            for attribute in META_ATTRIBUTES:
+                if attributes.get(attribute) and 'content' in attributes:
+                    self.meta[attribute].setdefault(attributes[attribute].lower(), attributes['content'])
+        elif attributes.get('href'):
+            for rel in attributes.get('rel', '').lower().split():
+                self.links[rel].append(attributes['href'])
+
+    def _add_json_ld(self, script):
+        script = script.strip()
+        # Some CMSs wrap the JSON in a comment or CDATA section
+        for prefix, suffix in (('<!--', '-->'), ('//<![CDATA[', '//]]>'), ('<![CDATA[', ']]>')):
+            if script.startswith(prefix) and script.endswith(suffix):
+                script = script[len(prefix):-len(suffix)].strip()
+        try:
+            self.json_ld.append(json.loads(script, strict=False))
+        except ValueError as e:
+            logging.debug(f"Skipping invalid JSON-LD block: {e}")
+
+    def json_ld_objects(self):
+        """
+        Every JSON-LD object, including those nested in @graph, lists and properties.
+        """
+        stack = list(reversed(self.json_ld))
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(reversed(item))
+            elif isinstance(item, dict):
+                yield item
+                stack.extend(reversed([value for value in item.values() if isinstance(value, (dict, list))]))
+
+    @cached_property
+    def schema_types(self):
+        types = []
+        for item in self.json_ld_objects():
+            declared = item.get('@type', [])
+            types.extend([declared] if isinstance(declared, str) else declared)
+        types.extend(self.microdata_types)
+        # Drop vocabulary prefixes such as "https://schema.org/Article"
+        return list(dict.fromkeys(str(name).rstrip('/').rsplit('/', 1)[-1] for name in types))
+
+    def first(self, attributes, *keys):
+        # The first of several <meta> keys that is present under any of the attributes
+        for key in keys:
+            for attribute in attributes:
+                if self.meta[attribute].get(key):
+                    return self.meta[attribute][key]
+        return None
+
+    def _prefixed(self, prefix):
+        # <meta> values whose key starts with prefix, declared with property or name
+        values = {}
+        for attribute in ('property', 'name'):
+            for key, value in self.meta[attribute].items():
+                if key.startswith(prefix):
+                    values.setdefault(key, value)
+        return values
+
+    def find_json_ld(self, *properties):
+        # The first JSON-LD object that has any of the properties
+        for item in self.json_ld_objects():
+            if any(item.get(name) for name in properties):
+                return item
+        return None
+
+    @property
+    def canonical(self):
+        return self.links['canonical'][0] if self.links.get('canonical') else None
+
+    @property
+    def open_graph(self):
+        return self._prefixed('og:')
+
+    @property
+    def twitter(self):
+        return self._prefixed('twitter:')
+
+    @property
+    def modified(self):
+        # Last modification date from meta tags, falling back to JSON-LD
+        modified = self.first(('name', 'http-equiv', 'property'),
+                              'last-modified', 'article:modified_time', 'og:updated_time', 'dcterms.modified')
+        if modified is None:
+            item = self.find_json_ld('dateModified')
+            modified = item['dateModified'] if item else None
+        return modified
+
+    @property
+    def local_business(self):
+        """
+        Name, address and phone from name/address/phone meta tags, or from
+        the first JSON-LD object with an address or telephone.
+        """
+        item = self.find_json_ld('address', 'telephone') or {}
+        address = item.get('address')
+        if isinstance(address, list):
+            address = address[0] if address else None
+        if isinstance(address, dict):
+            parts = [address.get(field) for field in
+                     ('streetAddress', 'addressLocality', 'addressRegion', 'postalCode', 'addressCountry')]
+            parts = [part.get('name') if isinstance(part, dict) else part for part in parts]
+            address = ", ".join(str(part) for part in parts if part)
+        return {
+            "Name": self.first(('name',), 'name') or (item.get('name') if item else None),
+            "Address": self.first(('name',), 'address') or address or None,
+            "Phone": self.first(('name',), 'phone') or item.get('telephone'),
+        }
+
+
+class ModelManager:
+    """
+    Loads spaCy pipelines on first use and keeps one per model name for the
+    whole process, however many analyzers are created. Call preload() before
+    forking a worker pool so the children share the loaded model
+    copy-on-write instead of each loading its own.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def get(self, name=DEFAULT_NLP_MODEL):
+        with self._lock:
+            if name not in self._models:
+                import spacy
+                start_time = time.perf_counter()
+                self._models[name] = spacy.load(name)
+                logging.debug(f"Loaded spaCy model {name} in {time.perf_counter() - start_time:.2f}s")
+            return self._models[name]
+
+    def preload(self, *names):
+        for name in names or (DEFAULT_NLP_MODEL,):
+            self.get(name)
+        # Move everything loaded so far out of the collector's reach, so that
+        # collections in forked children do not touch (and copy) shared pages
+        gc.freeze()
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+# Process-wide model cache used by every SEOAnalyzer
+MODELS = ModelManager()
+
+
+class FetchAborted(Exception):
+    """
+    Raised when a page is not analyzed because of its content type or size.
+    """
+
+
+def parse_charset(value):
+    """
+    The charset named in a Content-Type style value, if it is a known codec.
+    """
+    match = re.search(r'charset=["\']?([\w.:-]+)', value or '', re.IGNORECASE)
+    if not match:
+        return None
+    try:
+        return codecs.lookup(match.group(1)).name
+    except LookupError:
+        return None
+
+
+class HeadParser(HTMLParser):
+    """
+    Incremental parser fed the first chunks of a page. It notes the
+    <meta charset> and flags when the <head> is complete, either at </head>
+    or at the first tag that can only appear in the body.
+    """
+
+    HEAD_TAGS = {'html', 'head', 'title', 'meta', 'link', 'script', 'style', 'base', 'noscript', 'template'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.complete = False
+        self.charset = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'meta':
+            attrs = dict(attrs)
+            if attrs.get('charset'):
+                self.charset = parse_charset(f"charset={attrs['charset']}")
+            elif (attrs.get('http-equiv') or '').lower() == 'content-type':
+                self.charset = parse_charset(attrs.get('content'))
+        elif tag not in self.HEAD_TAGS:
+            self.complete = True
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.complete = True
+
+
+def normalize_url(url):
+    """
+    Canonical form of an absolute URL used as a cache key: lowercase scheme and
+    host, no default port, no fragment and '/' for an empty path.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+class LinkStatusCache:
+    """
+    Status records for checked links, keyed by normalized URL.
+    Entries expire after ttl seconds and the least recently used ones are
+    evicted beyond max_entries. With a db_path the records are also written
+    to SQLite, so they survive between runs.
+    """
+
+    def __init__(self, max_entries=10000, ttl=3600, db_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS link_status ("
+                "url TEXT PRIMARY KEY, status INTEGER, final_status INTEGER, error TEXT, checked_at REAL)"
+            )
+            self._db.commit()
+
+    def get(self, url):
+        now = time.time()
+        with self._lock:
+            record = self._entries.get(url)
+            if record is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT url, status, final_status, error, checked_at FROM link_status WHERE url = ?",
+                    (url,)
+                ).fetchone()
+                if row:
+                    record = dict(zip(("url", "status", "final_status", "error", "checked_at"), row))
+                    self._store(record)
+            if record is None:
+                return None
+            if now - record["checked_at"] > self.ttl:
+                del self._entries[url]
+                return None
+            self._entries.move_to_end(url)
+            return record
+
+    def set(self, record):
+        with self._lock:
+            self._store(record)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO link_status VALUES (?, ?, ?, ?, ?)",
+                    (record["url"], record["status"], record["final_status"], record["error"],
+                     record["checked_at"])
+                )
+                self._db.commit()
+
+    def _store(self, record):
+        self._entries[record["url"]] = record
+        self._entries.move_to_end(record["url"])
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+
+
+# Stats of the checks currently being measured in this context, innermost last
+_active_stats = contextvars.ContextVar('active_stats', default=())
+# Stats collected for the report being built in this context
+_report_stats = contextvars.ContextVar('report_stats', default=None)
+
+
+class CheckStats:
+    """
+    Wall time, CPU time (of the measuring thread), HTTP request count and
+    bytes fetched for one check or stage.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.http_requests = 0
+        self.bytes_fetched = 0
+        self._lock = threading.Lock()  # Requests may complete on fetch worker threads
+
+    def add_request(self, size):
+        with self._lock:
+            self.http_requests += 1
+            self.bytes_fetched += size
+
+    def add_bytes(self, size):
+        with self._lock:
+            self.bytes_fetched += size
+
+    def as_dict(self):
+        return {
+            "Wall Time (seconds)": self.wall_time,
+            "CPU Time (seconds)": self.cpu_time,
+            "HTTP Requests": self.http_requests,
+            "Bytes Fetched": self.bytes_fetched,
+        }
+
+
+def record_http_request(size):
+    """
+    Count one HTTP response of size bytes against every check being measured.
+    """
+    for stats in _active_stats.get():
+        stats.add_request(size)
+
+
+def record_http_bytes(size):
+    """
+    Count bytes read from a streamed response against every check being measured.
+    """
+    for stats in _active_stats.get():
+        stats.add_bytes(size)
+
+
+def _count_response(response, *args, **kwargs):
+    # Session response hook; streamed bodies are counted by whoever reads them
+    record_http_request(0 if kwargs.get('stream') else len(response.content))
+
+
+# Analyzers using each session, so that _count_response is added once and
+# only removed when the last of them closes
+_hook_users = weakref.WeakKeyDictionary()
+_hook_lock = threading.Lock()
+
+
+def _attach_counter(session):
+    with _hook_lock:
+        _hook_users[session] = _hook_users.get(session, 0) + 1
+        if _count_response not in session.hooks['response']:
+            session.hooks['response'].append(_count_response)
+
+
+def _detach_counter(session):
+    with _hook_lock:
+        users = _hook_users.get(session, 0) - 1
+        if users > 0:
+            _hook_users[session] = users
+            return
+        _hook_users.pop(session, None)
+        if _count_response in session.hooks['response']:
+            session.hooks['response'].remove(_count_response)
+
+
+class PrometheusExporter:
+    """
+    Instrumentation callback that aggregates check stats and writes them in
+    the Prometheus text exposition format, e.g. for node_exporter's textfile
+    collector. The file is rewritten atomically at most every flush_interval
+    seconds, and on write().
+    """
+
+    METRICS = (
+        ("seoanalyzer_check_runs_total", "Number of times the check ran", None),
+        ("seoanalyzer_check_wall_seconds_total", "Wall time spent in the check", "Wall Time (seconds)"),
+        ("seoanalyzer_check_cpu_seconds_total", "CPU time spent in the check", "CPU Time (seconds)"),
+        ("seoanalyzer_check_http_requests_total", "HTTP requests made by the check", "HTTP Requests"),
+        ("seoanalyzer_check_bytes_fetched_total", "Bytes fetched by the check", "Bytes Fetched"),
+    )
+
+    def __init__(self, path, flush_interval=10):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._totals = defaultdict(lambda: defaultdict(float))
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+
+    def __call__(self, url, name, stats):
+        with self._lock:
+            totals = self._totals[name]
+            totals[None] += 1
+            for key, value in stats.items():
+                totals[key] += value
+            due = time.monotonic() - self._last_write >= self.flush_interval
+        if due:
+            self.write()
+
+    def write(self):
+        with self._lock:
+            lines = []
+            for metric, description, key in self.METRICS:
+                lines.append(f"# HELP {metric} {description}")
+                lines.append(f"# TYPE {metric} counter")
+                for name, totals in sorted(self._totals.items()):
+                    label = name.replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'{metric}{{check="{label}"}} {totals[key]}')
+            self._last_write = time.monotonic()
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as file:
+                file.write('\n'.join(lines) + '\n')
+            os.replace(tmp_path, self.path)
+
+
+class PageCache:
+    """
+    Validators (ETag, Last-Modified), a content hash, the compressed body and
+    the content-derived report sections of previously analyzed pages, keyed by
+    URL. Lets analyze_page_speed send conditional requests and reuse results
+    for unchanged pages. Least recently used entries are evicted beyond
+    max_entries; with a db_path entries are also kept in SQLite.
+    """
+
+    FIELDS = ("url", "etag", "last_modified", "content_hash", "encoding", "body", "results", "fetched_at")
+
+    def __init__(self, max_entries=1000, db_path=None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                "content_hash TEXT, encoding TEXT, body BLOB, results TEXT, fetched_at REAL)"
+            )
+            self._db.commit()
+
+    def get(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    f"SELECT {', '.join(self.FIELDS)} FROM pages WHERE url = ?", (url,)
+                ).fetchone()
+                if row:
+                    entry = dict(zip(self.FIELDS, row))
+                    entry["results"] = json.loads(entry["results"])
+                    self._store(entry)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def set(self, entry):
+        with self._lock:
+            self._store(entry)
+            if self._db is not None:
+                row = dict(entry, results=json.dumps(entry["results"], cls=SEOJSONEncoder))
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO pages VALUES ({', '.join('?' * len(self.FIELDS))})",
+                    [row[field] for field in self.FIELDS]
+                )
+                self._db.commit()
+
+    def _store(self, entry):
+        self._entries[entry["url"]] = entry
+        self._entries.move_to_end(entry["url"])
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that applies a default timeout to requests which do not set one.
+    """
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def build_session(pool_connections=10, pool_maxsize=32, retries=2, backoff_factor=0.3,
+                  timeout=10, user_agent=DEFAULT_USER_AGENT):
+    """
+    Create a requests Session with a keep-alive connection pool shared by every check.
+    pool_connections is the number of hosts kept pooled, pool_maxsize the number of
+    connections kept per host.
+    """
+    # Retry-After is not honoured: a server asking for an hour would otherwise
+    # stall a worker for that long, unbounded by the timeout
+    retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=FetchEngine.RETRY_STATUSES,
+                  allowed_methods=frozenset({'GET', 'HEAD'}), raise_on_status=False,
+                  respect_retry_after_header=False)
+    adapter = TimeoutHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                 max_retries=retry, timeout=timeout)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'User-Agent': user_agent, 'Connection': 'keep-alive'})
+    return session
+
+
+class FetchEngine:
+    """
+    Issue many HTTP requests concurrently on an asyncio event loop.
+    Requests are bounded by a global and a per-host concurrency limit, and
+    connection errors, timeouts and 5xx/429 responses are retried with
+    exponential backoff. Each job is a (method, url, kwargs) tuple.
+
+    Jobs with stream=True have their body read and closed while still
+    holding the host slot, like a browser downloading over one of its few
+    connections per origin. Their results also carry the time to first byte,
+    the bytes transferred and when the request started relative to the batch.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, max_concurrency=32, per_host_limit=6, timeout=10, retries=2, backoff=0.5, send=None):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.send = send or requests.request  # Usually a pooled Session.request
+
+    def fetch_all(self, jobs):
+        """
+        Run the jobs and return one result dict per job, in input order.
+        Inside a running event loop (Jupyter, async servers) the jobs run on
+        a loop of their own in a helper thread; async callers can await
+        gather() instead.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.gather(jobs))
+        # Carry the context over, so instrumentation still sees the active checks
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=1) as helper:
+            return helper.submit(context.run, asyncio.run, self.gather(jobs)).result()
+
+    async def gather(self, jobs):
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host_limit))
+        origin = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return await asyncio.gather(*(
+                self._fetch(executor, global_limit, host_limits, origin, method, url, kwargs)
+                for method, url, kwargs in jobs
+            ))
+
+    def _transfer(self, method, url, kwargs):
+        # Runs in an executor thread; returns the response, time to first byte and bytes transferred
+        start_time = time.perf_counter()
+        response = self.send(method, url, **kwargs)
+        ttfb = time.perf_counter() - start_time
+        if not kwargs.get('stream'):
+            return response, ttfb, None
+        try:
+            size = 0
+            for chunk in response.iter_content(chunk_size=FETCH_CHUNK_SIZE):
+                size += len(chunk)
+                record_http_bytes(len(chunk))
+            # Bytes on the wire, before any Content-Encoding is undone
+            return response, ttfb, response.raw.tell() or size
+        finally:
+            response.close()
+
+    async def _fetch(self, executor, global_limit, host_limits, origin, method, url, kwargs):
+        loop = asyncio.get_running_loop()
+        kwargs = {'timeout': self.timeout, **kwargs}
+        # Executor threads do not inherit context variables, which instrumentation relies on
+        send = partial(contextvars.copy_context().run, self._transfer, method, url, kwargs)
+        result = {"url": url, "response": None, "status": None, "elapsed": None, "error": None,
+                  "start": None, "ttfb": None, "size": None}
+
+        for attempt in range(self.retries + 1):
+            # Take the host slot first so a busy host does not hold global slots
+            async with host_limits[urlparse(url).netloc], global_limit:
+                start_time = time.perf_counter()
+                try:
+                    response, ttfb, size = await loop.run_in_executor(executor, send)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    result.update(response=None, status=None, elapsed=None, error=str(e), ttfb=None, size=None)
+                except requests.exceptions.RequestException as e:
+                    # Invalid URLs and the like will not get better on retry
+                    result.update(response=None, status=None, elapsed=None, error=str(e), ttfb=None, size=None)
+                    return result
+                else:
+                    result.update(
+                        response=response,
+                        status=response.status_code,
+                        elapsed=time.perf_counter() - start_time,
+                        error=None,
+                        start=start_time - origin,
+                        ttfb=ttfb,
+                        size=size,
+                    )
+                    if response.status_code not in self.RETRY_STATUSES:
+                        return result
+
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+        return result
+
+
+class AnalysisContext:
+    """
+    State of one page fetch, shared by the checks of a report. The parsed
+    page and the extracted resources are only built if a check asks for them.
+    """
+
+    def __init__(self, analyzer, url, response, total_load_time, body, encoding, site_url=None, page_size=None,
+                 use_waterfall=False):
+        self.analyzer = analyzer
+        self.url = url
+        self.site_url = site_url
+        self.response = response
+        # None when the read stopped early (size cap, head-only fetch), as the
+        # time and size of a partial read say nothing about the page
+        self.total_load_time = total_load_time
+        self.body = body  # May be cut short, or come from the page cache
+        self.encoding = encoding
+        self.server_response_time = float(response.elapsed.total_seconds())
+        self.page_size = None if page_size is None else page_size / 1024  # Size in KB
+        self.use_waterfall = use_waterfall  # Whether the asset waterfall is part of the report
+
+    @cached_property
+    def html(self):
+        return self.body.decode(self.encoding, errors='replace')
+
+    @cached_property
+    def page(self):
+        return ParsedPage(self.html, self.url, self.site_url)
+
+    @cached_property
+    def resources(self):
+        return self.analyzer.extract_resources(self.page, self.url)
+
+    @cached_property
+    def waterfall(self):
+        return self.analyzer.analyze_resource_waterfall(
+            self.resources, self.analyzer.find_render_blocking(self.page, self.url),
+            self.total_load_time or 0.0, self.page_size or 0.0
+        )
+
+    @cached_property
+    def speed_data(self):
+        # The root fetch alone, or the whole page when the report measures its assets anyway
+        speed_data = {"Total Load Time (seconds)": self.total_load_time, "Page Size (KB)": self.page_size}
+        if self.use_waterfall:
+            speed_data.update(self.waterfall)
+        return speed_data
+
+
+# Report sections in report order: name -> (requirements, check(analyzer, context)).
+# Requirements declare what a check costs beyond the page fetch itself: "head"
+# parses the <head> only, "body" times and sizes the whole page download,
+# "html" parses the whole page, "nlp" runs spaCy and "network" makes extra
+# requests. The page is only read in full when some check needs more than "head".
+CHECKS = OrderedDict()
+
+# Requirements each profile may use; None allows every check
+# "head" checks only look at the <head>, which can be read without downloading the whole page
+PROFILES = {
+    "head": frozenset({"head"}),
+    "fast": frozenset({"head", "body", "html"}),
+    "content": frozenset({"head", "body", "html", "nlp"}),
+    "full": None,
+}
+
+
+def register_check(name, requires, check):
+    """
+    Add a report section, or replace the existing one with the same name.
+    """
+    CHECKS[name] = (frozenset(requires), check)
+
+
+def is_content_check(name):
+    # Depends on nothing but the page content, so its result can be reused
+    # for as long as the content does not change
+    requires = CHECKS[name][0]
+    return bool(requires) and requires <= {"head", "html", "nlp"}
+
+
+register_check("Total Load Time (seconds)", ("body",), lambda analyzer, ctx: ctx.total_load_time)
+register_check("Server Response Time (seconds)", (), lambda analyzer, ctx: ctx.server_response_time)
+register_check("Page Size (KB)", ("body",), lambda analyzer, ctx: ctx.page_size)
+# Sections built from the asset waterfall
+WATERFALL_CHECKS = ("Resource Load Times", "Resource Waterfall")
+register_check("Resource Load Times", ("html", "network"),
+               lambda analyzer, ctx: analyzer.analyze_resource_load_times(ctx.resources, ctx.waterfall))
+register_check("Resource Waterfall", ("html", "network"), lambda analyzer, ctx: ctx.waterfall)
+# Scored on the critical path and total page weight when the report includes the waterfall;
+# WATERFALL_CHECKS come first, so these two never fetch anything themselves.
+# Not scored when the page was only read in part.
+register_check("Performance Score", ("body",), lambda analyzer, ctx: None if ctx.total_load_time is None else (
+    analyzer.calculate_performance_score(
+        ctx.speed_data.get("Critical Path (seconds)", ctx.total_load_time),
+        ctx.speed_data.get("Total Page Weight (KB)", ctx.page_size)
+    )
+))
+register_check("Mobile Friendliness", ("head",), lambda analyzer, ctx: analyzer.check_mobile_friendly(ctx.page))
+register_check("HTTPS Check", (), lambda analyzer, ctx: analyzer.check_https(ctx.response))
+register_check("Page Title", ("head",), lambda analyzer, ctx: analyzer.check_page_title(ctx.page))
+register_check("Meta Description", ("head",), lambda analyzer, ctx: analyzer.check_meta_description(ctx.page))
+register_check("Header Structure", ("html",), lambda analyzer, ctx: analyzer.analyze_header_structure(ctx.page))
+register_check("Internal Links", ("html",),
+               lambda analyzer, ctx: analyzer.analyze_internal_links(ctx.page, ctx.page.site_url))
+register_check("External Links", ("html",), lambda analyzer, ctx: analyzer.analyze_external_links(ctx.page, ctx.url))
+register_check("Image Alt Text", ("html",), lambda analyzer, ctx: analyzer.check_image_alt_text(ctx.page))
+register_check("Broken Internal Links", ("html", "network"),
+               lambda analyzer, ctx: analyzer.check_broken_internal_links(ctx.page, ctx.page.site_url))
+register_check("XML Sitemap", ("network",), lambda analyzer, ctx: analyzer.check_xml_sitemap(ctx.url))
+register_check("Robots.txt", ("network",), lambda analyzer, ctx: analyzer.check_robots_txt(ctx.url))
+register_check("Canonical Tags", ("head",), lambda analyzer, ctx: analyzer.check_canonical_tags(ctx.page))
+register_check("Schema Markup", ("html",), lambda analyzer, ctx: analyzer.check_schema_markup(ctx.page))
+register_check("Content Freshness", ("head",), lambda analyzer, ctx: analyzer.check_content_freshness(ctx.page))
+register_check("Keyword Density", ("html", "nlp"), lambda analyzer, ctx: analyzer.analyze_keyword_density(ctx.page))
+register_check("Content Quality", ("html", "nlp"), lambda analyzer, ctx: analyzer.assess_content_quality(ctx.page))
+register_check("Social Media Analysis", ("head",), lambda analyzer, ctx: analyzer.social_media_analysis(ctx.page))
+register_check("Rich Content Analysis", ("html",), lambda analyzer, ctx: analyzer.rich_content_analysis(ctx.page))
+register_check("SEO Suggestions", ("body",), lambda analyzer, ctx: analyzer.speed_optimization_suggestions(ctx.speed_data))
+register_check("Local SEO Analysis", ("head",), lambda analyzer, ctx: analyzer.local_seo_analysis(ctx.page))
+# Placeholder data until a real SEO API is wired in; treated as a network check
+register_check("Competitor Analysis", ("network",),
+               lambda analyzer, ctx: analyzer.competitor_analysis("https://competitor.com"))
+register_check("404 Errors", ("html", "network"), lambda analyzer, ctx: analyzer.analyze_404_errors(ctx.page.internal_urls))
+register_check("Broken Links", ("html", "network"), lambda analyzer, ctx: analyzer.check_broken_links(ctx.page.internal_urls))
+
+
 class SEOAnalyzer: 
  
-    def __init__(self): 
-        self.nlp = spacy.load("en_core_web_sm")  # Load the SpaCy model 
+    def __init__(self, session=None, fetch_engine=None, link_cache=None, page_cache=None, metrics_store=None,
+                 timeout=10, pool_maxsize=32, retries=2, user_agent=DEFAULT_USER_AGENT, instrumentation=None,
+                 nlp_model=DEFAULT_NLP_MODEL, max_body_size=10 * 1024 * 1024, max_decompression_ratio=100): 
+        self.nlp_model = nlp_model  # Loaded through MODELS by the first check that needs it
+        self._nlp = None
         self.broken_links_log = []  # Initialize broken links log 
+        self.timeout = timeout
+        self.max_body_size = max_body_size  # Bytes of a page body read at most
+        self.max_decompression_ratio = max_decompression_ratio
+        # Every network call goes through one pooled, keep-alive session.
+        # A session passed in belongs to the caller and is left open by close().
+        self._owns_session = session is None
+        self.session = session or build_session(pool_maxsize=pool_maxsize, retries=retries,
+                                                timeout=timeout, user_agent=user_agent)
+        _attach_counter(self.session)
+        self._closed = False
+        # Callables receiving (url, check name, stats dict) after every measured check
+        self.instrumentation = list(instrumentation or [])
+        # Concurrent fetches for link and asset checks, sharing the same pool.
+        # The session's adapter already retries with backoff, so the engine does not.
+        self.fetch_engine = fetch_engine or FetchEngine(
+            max_concurrency=pool_maxsize, timeout=timeout, retries=0, send=self.session.request
+        )
+        # One status record per link, shared by every link check and page
+        self.link_cache = link_cache or LinkStatusCache()
+        # Validators and content-derived results of analyzed pages; pass False to disable
+        self.page_cache = PageCache() if page_cache is None else (page_cache or None)
+        self.metrics_store = metrics_store  # Created on first use by continuous_monitoring
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            self._nlp = MODELS.get(self.nlp_model)
+        return self._nlp
+
+    @nlp.setter
+    def nlp(self, nlp):
+        self._nlp = nlp
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            _detach_counter(self.session)
+        if self._owns_session:
+            self.session.close()
+        self.link_cache.close()
+        if self.page_cache is not None:
+            self.page_cache.close()
+        if self.metrics_store is not None:
+            self.metrics_store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
  
-    def analyze_page_speed(self, url): 
+    def analyze_page_speed(self, url, site_url=None, sections=None, profile=None, diagnostics=False): 
+        """
+        Fetch url and build its report. By default every registered check
+        runs; pass section names or a profile (see PROFILES) to compute only
+        those sections. With diagnostics=True the report also gets per-check
+        timings and request counts under "Diagnostics".
+        """
+        names = self.select_checks(sections, profile)
+        collected = []
+        token = _report_stats.set(collected)
         try: 
             # Start measuring time 
             start_time = time.time() 
  
-            # Make the initial request to get the HTML 
-            response = requests.get(url) 
-            response.raise_for_status() 
+            # Checks that only need the <head> let the fetch stop reading early;
+            # such partial bodies are kept out of the page cache
+            head_only = all(CHECKS[name][0] <= {"head"} for name in names)
+            use_cache = self.page_cache is not None and not head_only
+
+            # Make the initial request to get the HTML, conditional on what
+            # the page cache already holds
+            cache_key = self._page_cache_key(url, site_url)
+            cached = self.page_cache.get(cache_key) if use_cache else None
+            with self.measure("Fetch", url):
+                response, body, encoding, complete = self._fetch_page(url, cached, head_only)
  
             # Total load time 
-            total_load_time = time.time() - start_time 
+            total_load_time = time.time() - start_time if complete else None
+
+            page_size = len(body) if complete else None
+            if not complete and response.headers.get('Content-Length', '').isdigit():
+                page_size = int(response.headers['Content-Length'])
+            use_waterfall = any(name in WATERFALL_CHECKS for name in names)
+            context = AnalysisContext(self, url, response, total_load_time, body, encoding, site_url, page_size,
+                                      use_waterfall)
+            content_hash = hashlib.sha256(body).hexdigest()
+            reusable = cached["results"] if cached and cached["content_hash"] == content_hash else {}
+            if reusable:
+                logging.debug(f"Reusing cached analysis for unchanged page {url}")
              
-            # Analyzing response headers for performance metrics 
-            server_response_time = float(response.elapsed.total_seconds()) 
-            page_size = len(response.content) / 1024  # Size in KB 
- 
-            # Extracting resources 
-            resources = self.extract_resources(response.text, url) 
- 
-            # Analyzing resource load times 
-            resource_times = self.analyze_resource_load_times(resources) 
- 
-            # Analyze content quality and keyword density 
-            content = response.text 
-            keyword_density = self.analyze_keyword_density(content) 
-            content_quality = self.assess_content_quality(content) 
- 
-            # Analyze social media tags 
-            social_media = self.social_media_analysis(content) 
- 
-            # Analyze schema markup 
-            schema_info = self.rich_content_analysis(content) 
- 
-            # Constructing the final report 
-            report = { 
-                "URL": url, 
-                "Total Load Time (seconds)": total_load_time, 
-                "Server Response Time (seconds)": server_response_time, 
-                "Page Size (KB)": page_size, 
-                "Resource Load Times": resource_times, 
-                "Performance Score": self.calculate_performance_score(total_load_time, page_size), 
-                "Mobile Friendliness": self.check_mobile_friendly(response.text), 
-                "HTTPS Check": self.check_https(response), 
-                "Page Title": self.check_page_title(response.text), 
-                "Meta Description": self.check_meta_description(response.text), 
-                "Header Structure": self.analyze_header_structure(response.text), 
-                "Internal Links": self.analyze_internal_links(response.text, url), 
-                "External Links": self.analyze_external_links(content, url), 
-                "Image Alt Text": self.check_image_alt_text(response.text), 
-                "Broken Internal Links": self.check_broken_internal_links(response.text, url), 
-                "XML Sitemap": self.check_xml_sitemap(url), 
-                "Robots.txt": self.check_robots_txt(url), 
-                "Canonical Tags": self.check_canonical_tags(response.text), 
-                "Schema Markup": self.check_schema_markup(response.text), 
-                "Content Freshness": self.check_content_freshness(response.text), 
-                "Keyword Density": self.analyze_keyword_density(response.text), 
-                "Content Quality": self.assess_content_quality(response.text), 
-                "Social Media Analysis": self.social_media_analysis(response.text), 
-                "Rich Content Analysis": self.rich_content_analysis(response.text), 
-                "SEO Suggestions": self.speed_optimization_suggestions({ 
-                    "Total Load Time (seconds)": total_load_time, 
-                    "Page Size (KB)": page_size 
-                }), 
-                "Local SEO Analysis": self.local_seo_analysis(response.text), 
-                "Competitor Analysis": self.competitor_analysis("https://competitor.com"), 
-                "404 Errors": self.analyze_404_errors(self.analyze_internal_links(response.text, url)), 
-                "Broken Links": self.check_broken_links(self.analyze_internal_links(response.text, url)), 
-            } 
- 
-            return report 
- 
-        except requests.exceptions.RequestException as e: 
-            return {"error": str(e)} 
+            # Everything else (parsing, NLP, extra requests) is done on demand
+            # by the selected checks only
+            report = {"URL": url}
+            for name in names:
+                if name in reusable and is_content_check(name):
+                    report[name] = reusable[name]
+                    continue
+                with self.measure(name, url):
+                    report[name] = CHECKS[name][1](self, context)
+
+            if use_cache and complete:
+                self._update_page_cache(cache_key, response, context, content_hash, cached, reusable, report)
  
+        except (requests.exceptions.RequestException, FetchAborted) as e: 
+            report = {"URL": url, "error": str(e)}
+        finally:
+            _report_stats.reset(token)
+
+        if diagnostics:
+            report["Diagnostics"] = {stats.name: stats.as_dict() for stats in collected}
+        return report 
+
+    @contextmanager
+    def measure(self, name, url=None):
+        """
+        Record wall time, CPU time and HTTP traffic of the enclosed block. The
+        stats go to the report being built, if any, and to every
+        instrumentation callback.
+        """
+        stats = CheckStats(name)
+        token = _active_stats.set(_active_stats.get() + (stats,))
+        start_wall, start_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield stats
+        finally:
+            stats.wall_time = time.perf_counter() - start_wall
+            stats.cpu_time = time.thread_time() - start_cpu
+            _active_stats.reset(token)
+            collected = _report_stats.get()
+            if collected is not None:
+                collected.append(stats)
+            for callback in self.instrumentation:
+                try:
+                    callback(url, name, stats.as_dict())
+                except Exception:
+                    logging.exception(f"Instrumentation callback failed for {name}")
+
  
+ 
+    def _fetch_page(self, url, cached=None, head_only=False):
+        """
+        Stream the page body in chunks. Returns the response, the body, its
+        encoding and whether the body was read in full. Non-HTML responses and
+        suspiciously well compressed bodies raise FetchAborted; bodies larger
+        than max_body_size are cut off; with head_only reading stops once the
+        <head> has been seen.
+        """
+        response = self.session.get(url, headers=self._conditional_headers(cached), stream=True)
+        try:
+            response.raise_for_status()
+            if response.status_code == 304 and cached is not None:
+                return response, zlib.decompress(cached["body"]), cached["encoding"], True
+
+            content_type = response.headers.get('Content-Type', '')
+            if content_type and content_type.split(';')[0].strip().lower() not in HTML_CONTENT_TYPES:
+                raise FetchAborted(f"Skipped non-HTML content ({content_type})")
+
+            header_charset = parse_charset(content_type)
+            decoder = codecs.getincrementaldecoder(header_charset or 'utf-8')(errors='replace')
+            head = HeadParser()
+            chunks = []
+            size = 0
+            complete = True
+            for chunk in response.iter_content(chunk_size=FETCH_CHUNK_SIZE):
+                chunks.append(chunk)
+                size += len(chunk)
+                record_http_bytes(len(chunk))
+                # Compare decoded bytes with bytes read off the wire to catch decompression bombs
+                if size > 1024 * 1024 and size > self.max_decompression_ratio * max(response.raw.tell(), 1):
+                    raise FetchAborted(f"Decompressed body exceeds {self.max_decompression_ratio}x its transfer size")
+                if not head.complete:
+                    head.feed(decoder.decode(chunk))
+                    if head_only and head.complete:
+                        complete = False
+                        break
+                if size >= self.max_body_size:
+                    logging.warning(f"Body of {url} truncated at {self.max_body_size} bytes")
+                    complete = False
+                    break
+
+            body = b''.join(chunks)[:self.max_body_size]
+            return response, body, header_charset or head.charset or 'utf-8', complete
+        finally:
+            response.close()
+
+    def _conditional_headers(self, cached):
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers['If-None-Match'] = cached["etag"]
+            if cached["last_modified"]:
+                headers['If-Modified-Since'] = cached["last_modified"]
+        return headers
+
+    def _page_cache_key(self, url, site_url=None):
+        # Internal link sections depend on the site the page is analyzed for,
+        # so a page analyzed as part of a site gets an entry of its own
+        if site_url is None or site_url == url:
+            return url
+        return f"{url} {site_url}"  # URLs cannot contain spaces
+
+    def _update_page_cache(self, url, response, context, content_hash, cached, reusable, report):
+        results = dict(reusable)
+        results.update((name, value) for name, value in report.items()
+                       if name in CHECKS and is_content_check(name))
+        # A 304 carries no new validators worth keeping over the cached ones
+        headers = response.headers if response.status_code != 304 else {}
+        cached = cached or {}
+        self.page_cache.set({
+            "url": url,
+            "etag": headers.get('ETag', cached.get("etag")),
+            "last_modified": headers.get('Last-Modified', cached.get("last_modified")),
+            "content_hash": content_hash,
+            "encoding": context.encoding,
+            "body": zlib.compress(context.body),
+            "results": results,
+            "fetched_at": time.time(),
+        })
+
+    def select_checks(self, sections=None, profile=None):
+        """
+        Names of the checks to run, in report order.
+        """
+        if sections is not None:
+            unknown = [name for name in sections if name not in CHECKS]
+            if unknown:
+                raise ValueError(f"Unknown report sections: {', '.join(unknown)}")
+            return [name for name in CHECKS if name in sections]
+        if profile is None:
+            return list(CHECKS)
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile: {profile}")
+        allowed = PROFILES[profile]
+        return [name for name, (requires, _) in CHECKS.items() if allowed is None or requires <= allowed]
+
+    def _as_page(self, html_content, base_url=None):
+        # Checks accept either raw HTML or an already parsed page
+        if isinstance(html_content, ParsedPage):
+            return html_content
+        return ParsedPage(html_content, base_url)
+
+    def _as_html(self, html_content):
+        if isinstance(html_content, ParsedPage):
+            return html_content.html
+        return html_content
+
     def extract_resources(self, html_content, base_url): 
-        soup = BeautifulSoup(html_content, 'html.parser') 
+        page = self._as_page(html_content, base_url)
         resources = { 
             "css": [], 
             "js": [], 
@@ -106,19 +1209,19 @@ class SEOAnalyzer:
         } 
          
         # Extract CSS files 
-        for link in soup.find_all('link', rel='stylesheet'): 
+        for link in page.link_tags:
             css_url = link.get('href') 
-            if css_url: 
+            if css_url and 'stylesheet' in (link.get('rel') or []):
                 resources["css"].append(self.resolve_url(css_url, base_url)) 
          
         # Extract JS files 
-        for script in soup.find_all('script'): 
+        for script in page.script_tags:
             js_url = script.get('src') 
             if js_url: 
                 resources["js"].append(self.resolve_url(js_url, base_url)) 
          
         # Extract images 
-        for img in soup.find_all('img'): 
+        for img in page.images:
             img_url = img.get('src') 
             if img_url: 
                 resources["images"].append(self.resolve_url(img_url, base_url)) 
@@ -126,39 +1229,114 @@ class SEOAnalyzer:
         return resources 
  
     def resolve_url(self, resource_url, base_url): 
-        if urlparse(resource_url).netloc: 
-            return resource_url 
-        else: 
-            return requests.compat.urljoin(base_url, resource_url) 
+        return resolve_url(resource_url, base_url)
  
-    def analyze_resource_load_times(self, resources): 
+    def find_render_blocking(self, html_content, base_url):
+        """
+        URLs of the stylesheets and synchronous scripts that hold up the first render.
+        """
+        page = self._as_page(html_content, base_url)
+        blocking = set()
+        for link in page.link_tags:
+            media = (link.get('media') or 'all').lower()
+            if link.get('href') and 'stylesheet' in (link.get('rel') or []) and media in ('all', 'screen'):
+                blocking.add(self.resolve_url(link['href'], base_url))
+        for script in page.script_tags:
+            if (script.get('src') and not script.has_attr('async') and not script.has_attr('defer')
+                    and script.get('type') != 'module'):
+                blocking.add(self.resolve_url(script['src'], base_url))
+        return blocking
+
+    def analyze_resource_waterfall(self, resources, render_blocking=(), document_time=0.0, document_size=0.0):
+        """
+        Download the page's assets the way a browser would: concurrently, over
+        at most per_host_limit connections per origin. Each asset gets its
+        start offset, time to first byte, duration and transfer size. The
+        critical path is the document fetch plus the last render-blocking
+        asset to finish; the page weight adds up the document and every asset.
+        """
+        assets = [
+            (resource_type, url) for resource_type, urls in resources.items()
+            for url in dict.fromkeys(urls)  # A browser fetches each URL once
+        ]
+        results = self.fetch_engine.fetch_all(('GET', url, {'timeout': 5, 'stream': True}) for _, url in assets)
+
+        waterfall = []
+        for (resource_type, url), result in zip(assets, results):
+            failed = result["error"] is not None
+            waterfall.append({
+                "URL": url,
+                "Type": resource_type,
+                "Status": result["status"],
+                "Start (seconds)": None if failed else result["start"],
+                "TTFB (seconds)": None if failed else result["ttfb"],
+                "Duration (seconds)": None if failed else result["elapsed"],
+                "Transfer Size (KB)": (result["size"] or 0) / 1024,
+                "Render Blocking": url in render_blocking,
+                "Error": result["error"],
+            })
+
+        def finished(entries):
+            return max((entry["Start (seconds)"] + entry["Duration (seconds)"]
+                        for entry in entries if entry["Duration (seconds)"] is not None), default=0.0)
+
+        blocking = [entry for entry in waterfall if entry["Render Blocking"]]
+        return {
+            "Critical Path (seconds)": document_time + finished(blocking),
+            "Fully Loaded (seconds)": document_time + finished(waterfall),
+            "Total Page Weight (KB)": document_size + sum(entry["Transfer Size (KB)"] for entry in waterfall),
+            "Render Blocking Resources": len(blocking),
+            "Failed Requests": sum(1 for entry in waterfall
+                                   if entry["Error"] or (entry["Status"] or 0) >= 400),
+            "Assets": waterfall,
+        }
+
+    def analyze_resource_load_times(self, resources, waterfall=None): 
+        waterfall = waterfall or self.analyze_resource_waterfall(resources)
+        durations = {entry["URL"]: entry["Duration (seconds)"] for entry in waterfall["Assets"]}
+
         resource_times = {} 
         for resource_type, urls in resources.items(): 
-            load_times = [] 
-            for url in urls: 
-                start_time = time.time() 
-                try: 
-                    requests.get(url, timeout=5)  # Simulating load time 
-                    load_times.append(time.time() - start_time)  # Only append if successful
-                except requests.exceptions.RequestException: 
-                    load_times.append(None)  # Resource failed to load 
-            resource_times[resource_type] = load_times 
+            # None marks a resource that failed to load
+            resource_times[resource_type] = [durations.get(url) for url in urls]
         return resource_times  
      
     def speed_optimization_suggestions(self, speed_data): 
         """ 
         Provide suggestions for improving page loading speed based on the speed data. 
+        With the asset waterfall (see analyze_resource_waterfall) in speed_data,
+        the critical path, page weight and slow or failing assets are judged too.
         """ 
         recommendations = [] 
          
-        if speed_data['Total Load Time (seconds)'] > 2: 
+        # Either may be None when the page was only read in part
+        if (speed_data['Total Load Time (seconds)'] or 0) > 2: 
             recommendations.append("Consider optimizing images and using lazy loading.") 
-        if speed_data['Page Size (KB)'] > 100: 
+        if (speed_data['Page Size (KB)'] or 0) > 100: 
             recommendations.append("Minimize CSS and JavaScript files.") 
+
+        assets = speed_data.get('Assets', [])
+        if speed_data.get('Critical Path (seconds)', 0) > 2.5 and speed_data.get('Render Blocking Resources'):
+            recommendations.append(
+                f"{speed_data['Render Blocking Resources']} render-blocking CSS/JS files delay the first render; "
+                "inline critical CSS and load scripts with async or defer."
+            )
+        if speed_data.get('Total Page Weight (KB)', 0) > 1600:
+            recommendations.append(
+                f"The page weighs {speed_data['Total Page Weight (KB)']:.0f} KB in total; "
+                "compress images and remove unused code."
+            )
+        slow = [asset for asset in assets if (asset['TTFB (seconds)'] or 0) > 0.6]
+        if slow:
+            recommendations.append(f"{len(slow)} assets take over 600 ms to first byte; serve them from a CDN or cache.")
+        if speed_data.get('Failed Requests'):
+            recommendations.append(f"Fix the {speed_data['Failed Requests']} assets that fail to load.")
          
         return recommendations 
  
     def calculate_performance_score(self, load_time, page_size): 
+        if load_time is None or page_size is None:
+            return None  # Not measured, e.g. after a head-only fetch
         if load_time < 2: 
             return 100 - (load_time * 10) - (page_size / 100) 
         else: 
@@ -167,69 +1345,53 @@ class SEOAnalyzer:
  
     def check_mobile_friendly(self, html_content): 
         # Placeholder logic for mobile friendliness 
-        return "Yes" if '<meta name="viewport"' in html_content else "No" 
+        return "Yes" if 'viewport' in self._as_page(html_content).head.meta['name'] else "No" 
  
     def check_https(self, response): 
         return "Yes" if response.url.startswith('https://') else "No" 
  
     def check_page_title(self, html_content): 
-        soup = BeautifulSoup(html_content, 'html.parser') 
-        title = soup.title.string if soup.title else "Missing" 
-        return title 
+        title = self._as_page(html_content).head.title
+        return "Missing" if title is None else title 
  
     def check_meta_description(self, html_content): 
-        soup = BeautifulSoup(html_content, 'html.parser') 
-        description = soup.find('meta', attrs={'name': 'description'}) 
-        return description['content'] if description else "Missing" 
+        description = self._as_page(html_content).head.meta['name'].get('description')
+        return "Missing" if description is None else description 
  
     def analyze_header_structure(self, html_content): 
-        soup = BeautifulSoup(html_content, 'html.parser') 
+        page_headers = self._as_page(html_content).headers
         headers = { 
-            "H1 Count": len(soup.find_all('h1')), 
-            "H2 Count": len(soup.find_all('h2')), 
-            "H3 Count": len(soup.find_all('h3')) 
+            "H1 Count": len(page_headers['h1']),
+            "H2 Count": len(page_headers['h2']),
+            "H3 Count": len(page_headers['h3'])
         } 
         return headers 
      
     def analyze_internal_links(self, html_content, base_url): 
-        soup = BeautifulSoup(html_content, 'html.parser') 
-        internal_links = [] 
-        for link in soup.find_all('a', href=True): 
-            if self.resolve_url(link['href'], base_url).startswith(base_url): 
-                internal_links.append(link['href']) 
-        return internal_links 
+        page = self._as_page(html_content, base_url)
+        if page.site_url == base_url:
+            return list(page.internal_links)
+        return [href for href, absolute in page.links if absolute.startswith(base_url)]
  
     def analyze_external_links(self, content, url): 
-        # Parse the content with BeautifulSoup 
-        soup = BeautifulSoup(content, 'html.parser') 
-         
-        links = soup.find_all('a', href=True)  # Find all anchor tags with href 
-        external_links = [] 
- 
-        for link in links: 
-            link_href = link['href'] 
-            # Check if the link is external 
-            if urlparse(link_href).netloc != urlparse(url).netloc: 
-                external_links.append(link_href) 
- 
-        return external_links 
+        page = self._as_page(content, url)
+        if page.url == url:
+            return list(page.external_links)
+        netloc = urlparse(url).netloc
+        return [href for href, _ in page.links if urlparse(href).netloc != netloc]
  
     def check_image_alt_text(self, html_content): 
-        soup = BeautifulSoup(html_content, 'html.parser') 
-        images = soup.find_all('img') 
+        images = self._as_page(html_content).images
         missing_alt = [img['src'] for img in images if not img.get('alt')] 
         return missing_alt if missing_alt else "All images have alt text" 
  
     def check_broken_internal_links(self, html_content, base_url): 
         internal_links = self.analyze_internal_links(html_content, base_url) 
+        statuses = self.check_link_statuses(self.resolve_url(link, base_url) for link in internal_links)
         broken_links = [] 
-        for link in internal_links: 
-            try: 
-                response = requests.head(self.resolve_url(link, base_url)) 
-                if response.status_code != 200: 
-                    broken_links.append(link) 
-                    self.log_broken_link(link) 
-            except requests.exceptions.RequestException: 
+        for link in internal_links:
+            # Redirects count as broken here, as only the first response is considered
+            if statuses[self.resolve_url(link, base_url)]["status"] != 200:
                 broken_links.append(link) 
                 self.log_broken_link(link) 
         return broken_links 
@@ -237,7 +1399,7 @@ class SEOAnalyzer:
     def check_xml_sitemap(self, base_url): 
         sitemap_url = requests.compat.urljoin(base_url, '/sitemap.xml') 
         try: 
-            response = requests.head(sitemap_url) 
+            response = self.session.head(sitemap_url) 
             return "Exists" if response.status_code == 200 else "Not Found" 
         except requests.exceptions.RequestException: 
             return "Error fetching" 
@@ -245,61 +1407,179 @@ class SEOAnalyzer:
     def check_robots_txt(self, base_url): 
         robots_url = requests.compat.urljoin(base_url, '/robots.txt') 
         try: 
-            response = requests.get(robots_url) 
+            response = self.session.get(robots_url) 
             return response.text if response.status_code == 200 else "Not Found" 
         except requests.exceptions.RequestException: 
             return "Error fetching" 
  
     def check_canonical_tags(self, html_content): 
-        soup = BeautifulSoup(html_content, 'html.parser') 
-        canonical = soup.find('link', rel='canonical') 
-        return canonical['href'] if canonical else "Missing" 
+        canonical = self._as_page(html_content).head.canonical
+        return canonical or "Missing" 
  
     def check_content_freshness(self, html_content): 
-        last_modified = re.search(r'<meta name="last-modified" content="(.*?)"', html_content) 
-        return last_modified.group(1) if last_modified else "Not Found"
+        return self._as_page(html_content).head.modified or "Not Found"
  
+    def check_link_statuses(self, urls):
+        """
+        Return a status record for each URL, checking every distinct
+        normalized URL at most once and reusing cached records.
+        """
+        urls = list(urls)
+        records = {}
+        missing = []
+        for url in dict.fromkeys(normalize_url(url) for url in urls):
+            record = self.link_cache.get(url)
+            if record is None:
+                missing.append(url)
+            else:
+                records[url] = record
+
+        # One HEAD per link gives both the first and the final status
+        results = self.fetch_engine.fetch_all(('HEAD', url, {'allow_redirects': True}) for url in missing)
+        for url, result in zip(missing, results):
+            response = result["response"]
+            record = {
+                "url": url,
+                "status": None,
+                "final_status": None,
+                "error": result["error"],
+                "checked_at": time.time(),
+            }
+            if response is not None:
+                record["status"] = response.history[0].status_code if response.history else response.status_code
+                record["final_status"] = response.status_code
+            self.link_cache.set(record)
+            records[url] = record
+
+        return {url: records[normalize_url(url)] for url in urls}
+
     def log_broken_link(self, url): 
         logging.warning(f"Broken link detected: {url}") 
         with open('broken_links.txt', 'a+') as file:
             file.write(f"Broken link detected: {url}\n")
         self.broken_links_log.append(url) 
  
-    def analyze_keyword_density(self, text):
-        max_length = 1000000  # Maximum length for spaCy
-        if len(text) > max_length:
-            text = text[:max_length]  # Truncate the text
+    def process_text(self, source):
+        """
+        Run the NLP stage once over a page's visible text (or a raw string)
+        and derive every text metric from that single Doc.
+        """
+        if isinstance(source, ParsedPage) and source.nlp_results is not None:
+            return source.nlp_results
 
-        doc = self.nlp(text)
-        keywords = [token.lemma_ for token in doc if token.is_alpha and not token.is_stop]
-        vectorizer = CountVectorizer()
-        X = vectorizer.fit_transform([' '.join(keywords)])
-        keyword_freq = dict(zip(vectorizer.get_feature_names_out(), X.toarray()[0]))
-        return keyword_freq
- 
-    def assess_content_quality(self, text):
-        max_length = 1000000  # Maximum length for spaCy
-        if len(text) > max_length:
-            text = text[:max_length]  # Truncate the text if it exceeds the limit
+        text = source.text if isinstance(source, ParsedPage) else source
+        with self.measure("NLP", source.url if isinstance(source, ParsedPage) else None):
+            doc = self.nlp(text[:NLP_MAX_LENGTH], disable=self._unused_pipes())
+            results = self._summarize_doc(doc)
+
+        if isinstance(source, ParsedPage):
+            source.nlp_results = results
+        return results
+
+    def analyze_texts(self, sources, batch_size=64, n_process=1):
+        """
+        Run the NLP stage over many pages (or raw strings) at once by
+        streaming them through nlp.pipe. Set n_process above 1 (or -1 for
+        every core) to spread the work over several processes.
+        Results are returned in input order.
+        """
+        reports = []
+        with self.measure("NLP Batch"):
+            for results in self._summarize_all(sources, batch_size, n_process):
+                reports.append({
+                    "Keyword Density": results["keyword_density"],
+                    "Content Quality": {
+                        "Word Count": results["word_count"],
+                        "Sentiment Score": results["sentiment"]
+                    },
+                    "Topics Detected": results["topics"],
+                })
+        return reports
 
-        doc = self.nlp(text)
+    def build_keyword_corpus(self, pages, corpus=None, batch_size=64, n_process=1):
+        """
+        Add pages (ParsedPage objects or (url, text) pairs) to a KeywordCorpus,
+        a new one unless corpus is given, running the NLP stage in batches for
+        pages that have not been through it yet.
+        """
+        corpus = corpus if corpus is not None else KeywordCorpus()
+        pages = list(pages)
+        urls = [page.url if isinstance(page, ParsedPage) else page[0] for page in pages]
+        sources = [page if isinstance(page, ParsedPage) else page[1] for page in pages]
+        with self.measure("Keyword Corpus"):
+            for url, results in zip(urls, self._summarize_all(sources, batch_size, n_process)):
+                corpus.add(url, results["phrases"])
+        return corpus
 
-        # Calculate word count
-        word_count = len(doc)
+    def _summarize_all(self, sources, batch_size=64, n_process=1):
+        # Results of the NLP stage for every source, in input order; parsed
+        # pages keep theirs and are not sent through spaCy again
+        sources = list(sources)
+        done = [isinstance(source, ParsedPage) and source.nlp_results is not None for source in sources]
+        texts = [
+            (source.text if isinstance(source, ParsedPage) else source)[:NLP_MAX_LENGTH]
+            for source, cached in zip(sources, done) if not cached
+        ]
+        docs = iter(self.nlp.pipe(
+            texts, batch_size=batch_size, n_process=n_process, disable=self._unused_pipes()
+        ))
+        for source, cached in zip(sources, done):
+            if cached:
+                yield source.nlp_results
+                continue
+            results = self._summarize_doc(next(docs))
+            if isinstance(source, ParsedPage):
+                source.nlp_results = results
+            yield results
 
-        # Calculate sentiment score, ensuring the attribute exists
-        sentiment_score = getattr(doc._, 'polarity', 0)
+    def _unused_pipes(self):
+        # The checks only need tokens, lemmas and POS tags
+        return [name for name in ('parser', 'ner') if name in self.nlp.pipe_names]
+
+    def _summarize_doc(self, doc):
+        keywords = Counter()
+        topics = {}
+        # Runs of consecutive content lemmas, from which KeywordCorpus builds n-grams
+        phrases = [[]]
+        for token in doc:
+            if token.is_alpha and not token.is_stop:
+                keywords[token.lemma_] += 1
+            if token.pos_ in ('NOUN', 'PROPN'):
+                topics[token.lemma_] = None
+            if token.is_alpha and not token.is_stop and len(token.lemma_) > 1:
+                phrases[-1].append(token.lemma_.lower())
+            elif phrases[-1]:
+                phrases.append([])
+
+        # Same tokens CountVectorizer kept: lowercased, two characters or more
+        density = Counter()
+        for keyword, count in keywords.items():
+            if len(keyword) > 1:
+                density[keyword.lower()] += count
 
         return {
-            "Word Count": word_count,
-            "Sentiment Score": sentiment_score
+            "keywords": dict(keywords),
+            "keyword_density": dict(sorted(density.items())),
+            "word_count": len(doc),
+            "sentiment": getattr(doc._, 'polarity', 0),
+            "topics": list(topics),
+            "phrases": [phrase for phrase in phrases if phrase],
+        }
+
+    def analyze_keyword_density(self, text):
+        return self.process_text(text)["keyword_density"]
+ 
+    def assess_content_quality(self, text):
+        results = self.process_text(text)
+        return {
+            "Word Count": results["word_count"],
+            "Sentiment Score": results["sentiment"]
         } 
  
     def semantic_analysis(self, text): 
-        doc = self.nlp(text) 
-        topics = set(token.lemma_ for token in doc if token.pos_ in ['NOUN', 'PROPN']) 
+        topics = self.process_text(text)["topics"]
         return { 
-            "Topics Detected": list(topics), 
+            "Topics Detected": topics,
             "Topic Count": len(topics) 
         } 
  
@@ -322,29 +1602,18 @@ class SEOAnalyzer:
  
  
     def check_broken_links(self, urls): 
+        statuses = self.check_link_statuses(urls)
         broken_links = [] 
-        for url in urls: 
-            try: 
-                response = requests.head(url, allow_redirects=True) 
-                if response.status_code != 200: 
-                    broken_links.append(url) 
-                    self.log_broken_link(url) 
-            except requests.exceptions.RequestException: 
+        for url, record in statuses.items():
+            if record["final_status"] != 200:
                 broken_links.append(url) 
                 self.log_broken_link(url) 
         return broken_links 
      
  
     def local_seo_analysis(self, html_content): 
-        name = re.search(r'<meta name="name" content="(.*?)"', html_content) 
-        address = re.search(r'<meta name="address" content="(.*?)"', html_content) 
-        phone = re.search(r'<meta name="phone" content="(.*?)"', html_content) 
- 
-        return { 
-            "Name": name.group(1) if name else "Missing", 
-            "Address": address.group(1) if address else "Missing", 
-            "Phone": phone.group(1) if phone else "Missing" 
-        } 
+        business = self._as_page(html_content).head.local_business
+        return {field: value or "Missing" for field, value in business.items()}
  
     def core_web_vitals_check(self, url): 
         speed_data = self.fetch_speed_data(url) 
@@ -363,6 +1632,7 @@ class SEOAnalyzer:
  
     def compress_image(self, input_image_path, output_image_path, quality=80): 
         try: 
+            from PIL import Image
             with Image.open(input_image_path) as img: 
                 img.save(output_image_path, "JPEG", quality=quality) 
             return f"Image saved at {output_image_path} with {quality}% quality." 
@@ -370,7 +1640,67 @@ class SEOAnalyzer:
             logging.error(f"Error compressing image: {e}") 
             return str(e) 
  
-    def plot_seo_scores(self, current_scores, historical_scores): 
+    def optimize_images(self, sources, output_dir='optimized_images', **options):
+        """
+        Optimize images in bulk with an ImageOptimizer (options are passed on
+        to it). sources is a local directory, a list of image URLs (such as
+        the "images" of extract_resources) and file paths, or a single URL or
+        path. Returns one report per image and the total bytes saved.
+        """
+        optimizer = ImageOptimizer(output_dir, **options)
+        reports = list(optimizer.optimize(self._read_images(sources)))
+        return {
+            "Images": reports,
+            "Total Bytes Saved": sum(report.get("Bytes Saved", 0) for report in reports
+                                     if not report.get("Skipped")),
+        }
+
+    def _read_images(self, sources, batch_size=32):
+        # Yield (source, bytes) pairs, reading files lazily and downloading URLs in concurrent batches
+        if isinstance(sources, str) and os.path.isdir(sources):
+            sources = sorted(
+                os.path.join(root, name) for root, _, names in os.walk(sources) for name in names
+                if os.path.splitext(name)[1].lower() in ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tiff')
+            )
+        elif isinstance(sources, str):
+            sources = [sources]  # A single file path or URL
+        sources = list(sources)
+        for start in range(0, len(sources), batch_size):
+            batch = sources[start:start + batch_size]
+            urls = [source for source in batch if urlparse(source).scheme in ('http', 'https')]
+            downloads = {result["url"]: result for result in self.fetch_engine.fetch_all(
+                ('GET', url, {}) for url in urls
+            )}
+            for source in batch:
+                if source not in downloads:
+                    try:
+                        with open(source, 'rb') as file:
+                            data = file.read()
+                    except OSError as e:
+                        logging.warning(f"Could not read image {source}: {e}")
+                        continue
+                    yield source, data
+                elif downloads[source]["status"] == 200:
+                    yield source, downloads[source]["response"].content
+                else:
+                    logging.warning(f"Could not download image {source}: "
+                                    f"{downloads[source]['error'] or downloads[source]['status']}")
+
+    def plot_seo_scores(self, current_scores, historical_scores, path=None): 
+        """
+        Chart current against historical scores. With a path, or without a
+        display to show it on, the chart is written to a file (seo_scores.png
+        by default) through the headless renderer in seorender.
+        """
+        headless = sys.platform.startswith('linux') and not (
+            os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')
+        )
+        if path is not None or headless:
+            from seorender import render_scores
+            return render_scores(current_scores, historical_scores, path or 'seo_scores.png')
+
+        import matplotlib.pyplot as plt
+
         labels = list(current_scores.keys()) 
         current_values = list(current_scores.values()) 
         historical_values = list(historical_scores.values()) 
@@ -388,53 +1718,38 @@ class SEOAnalyzer:
         plt.grid() 
         plt.show() 
  
-    def continuous_monitoring(self, url): 
+    def continuous_monitoring(self, url, tolerance=0.0, sections=None, profile=None): 
         """ 
         Monitor the SEO status of the URL and log changes. 
-        This implementation uses a JSON file to store historical data. 
+        Every check is appended to the metrics store (historical_data.db by
+        default) and compared with the previous sample for the URL.
+        Returns the changed metrics, or None if the page could not be analyzed.
+        sections and profile select the report sections as in analyze_page_speed.
         """ 
-        historical_data_file = 'historical_data.json' 
-         
-        # Load previous data if exists 
-        previous_data = {} 
-        if os.path.exists(historical_data_file): 
-            with open(historical_data_file, 'r') as file: 
-                previous_data = json.load(file) 
- 
-        current_data = self.analyze_page_speed(url) 
-         
-        # Check if the URL is already in historical data 
-        if url not in previous_data: 
-            previous_data[url] = { 
-                "Total Load Time (seconds)": current_data["Total Load Time (seconds)"], 
-                "Server Response Time (seconds)": current_data["Server Response Time (seconds)"], 
-                "Page Size (KB)": current_data["Page Size (KB)"] 
-            } 
-        else: 
-            # Compare with historical data 
-            if (current_data['Total Load Time (seconds)'] != previous_data[url]['Total Load Time (seconds)'] or 
-                    current_data['Server Response Time (seconds)'] != previous_data[url]['Server Response Time (seconds)'] or 
-                    current_data['Page Size (KB)'] != previous_data[url]['Page Size (KB)']): 
-                logging.info(f"Change detected in SEO metrics for {url}: {current_data}") 
-                # Update historical data with current data 
-                previous_data[url].update(current_data) 
- 
-        # Save updated historical data 
-        with open(historical_data_file, 'w') as file: 
-            json.dump(previous_data, file, indent=4) 
- 
+        if self.metrics_store is None:
+            self.metrics_store = MetricsStore()
+
+        current_data = self.analyze_page_speed(url, sections=sections, profile=profile) 
+        if "error" in current_data:
+            logging.warning(f"Monitoring check failed for {url}: {current_data['error']}")
+            return None
+
+        changes = self.metrics_store.record(url, current_data, tolerance=tolerance)
+        if changes:
+            logging.info(f"Change detected in SEO metrics for {url}: {changes}") 
+        return changes
+
     def analyze_404_errors(self, url_list): 
         """ 
         Check for 404 errors on the given URLs and return a report. 
         """ 
+        statuses = self.check_link_statuses(url_list)
         error_404s = [] 
-        for url in url_list: 
-            try: 
-                response = requests.head(url) 
-                if response.status_code == 404: 
-                    error_404s.append(url) 
-                    logging.warning(f"404 Error detected for URL: {url}") 
-            except requests.exceptions.RequestException: 
+        for url, record in statuses.items():
+            if record["status"] == 404:
+                error_404s.append(url) 
+                logging.warning(f"404 Error detected for URL: {url}") 
+            elif record["error"]:
                 logging.error(f"Error checking URL: {url}") 
  
         return error_404s 
@@ -448,18 +1763,8 @@ class SEOAnalyzer:
         } 
      
     def check_schema_markup(self, content): 
-        # Example implementation: This should analyze the content and return the relevant schema types 
-        soup = BeautifulSoup(content, 'html.parser') 
-         
-        # For demonstration, let's say we want to check for a specific schema type in the content 
-        schema_types = [] 
- 
-        # This is just a placeholder logic; adjust it based on your actual requirements 
-        if "Article" in content: 
-            schema_types.append("Article") 
-        if "WebSite" in content: 
-            schema_types.append("WebSite") 
-         
+        # Types declared in JSON-LD (including @graph and nested objects) and microdata
+        schema_types = self._as_page(content).head.schema_types
         return { 
             'Schema Types Found': schema_types  # Ensure this is a list or other iterable 
         } 
@@ -495,12 +1800,10 @@ class SEOAnalyzer:
         """ 
         Analyze social media tags and their presence. 
         """ 
-        og_image = re.search(r'property="og:image" content="(.*?)"', html_content) 
-        twitter_image = re.search(r'name="twitter:image" content="(.*?)"', html_content) 
- 
+        head = self._as_page(html_content).head
         return { 
-            "Open Graph Image": og_image.group(1) if og_image else "Missing", 
-            "Twitter Image": twitter_image.group(1) if twitter_image else "Missing" 
+            "Open Graph Image": head.open_graph.get('og:image') or "Missing", 
+            "Twitter Image": head.first(('name', 'property'), 'twitter:image', 'twitter:image:src') or "Missing" 
         } 
      
      
@@ -509,16 +1812,810 @@ class SEOAnalyzer:
         """ 
         Perform a deeper analysis of keyword usage and opportunities. 
         """ 
-        doc = self.nlp(text) 
-        keywords = [token.lemma_ for token in doc if token.is_alpha and not token.is_stop] 
-        keyword_freq = {keyword: keywords.count(keyword) for keyword in set(keywords)} 
-         
-        return keyword_freq 
+        return self.process_text(text)["keywords"]
      
+class KeywordCorpus:
+    """
+    Keyword statistics over many pages at once. Every page is a row of a
+    sparse document-term matrix whose columns are lemmatized terms and the
+    n-gram phrases built from them. Pages can be added at any time: the
+    vocabulary grows as needed and the matrix (with everything derived from
+    it) is rebuilt on the next query. Adding a URL again replaces its row.
+    """
+
+    def __init__(self, max_ngram=3):
+        self.max_ngram = max_ngram
+        self.vocabulary = {}  # term -> column
+        self.terms = []  # column -> term
+        self.urls = []  # row -> URL
+        self._rows = {}  # URL -> row
+        self._counts = []  # row -> (columns, counts)
+        self._lengths = []  # row -> number of single-word terms
+        self._sizes = []  # column -> number of words in the term
+        self._matrix = None
+        self._derived = {}  # Arrays computed from the matrix, until the next add()
+
+    def __len__(self):
+        return len(self.urls)
+
+    def add(self, url, phrases):
+        """
+        Add a page given its phrases: runs of consecutive content lemmas, as
+        produced by SEOAnalyzer.process_text.
+        """
+        import numpy as np
+
+        counts = Counter()
+        length = 0
+        for phrase in phrases:
+            length += len(phrase)
+            counts.update(phrase)
+            for n in range(2, self.max_ngram + 1):
+                # Every run of n consecutive lemmas, joined into one term
+                counts.update(map(" ".join, zip(*(phrase[start:] for start in range(n)))))
+
+        columns = np.fromiter((self._column(term) for term in counts), dtype=np.int64, count=len(counts))
+        row = (columns, np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+        if url in self._rows:
+            self._counts[self._rows[url]] = row
+            self._lengths[self._rows[url]] = length
+        else:
+            self._rows[url] = len(self.urls)
+            self.urls.append(url)
+            self._counts.append(row)
+            self._lengths.append(length)
+        self._matrix = None
+        self._derived.clear()
+
+    def _column(self, term):
+        column = self.vocabulary.get(term)
+        if column is None:
+            column = self.vocabulary[term] = len(self.terms)
+            self.terms.append(term)
+            self._sizes.append(term.count(" ") + 1)
+        return column
+
+    @property
+    def matrix(self):
+        """
+        Term counts as a CSR matrix of shape (pages, terms).
+        """
+        if self._matrix is None:
+            import numpy as np
+            from scipy import sparse
+
+            indptr = np.zeros(len(self._counts) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(columns) for columns, _ in self._counts])
+            indices = np.concatenate([columns for columns, _ in self._counts] or [np.zeros(0, dtype=np.int64)])
+            data = np.concatenate([counts for _, counts in self._counts] or [np.zeros(0)])
+            self._matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(self.urls), len(self.terms)))
+            self._matrix.sort_indices()
+        return self._matrix
+
+    def _ngram_sizes(self):
+        if "sizes" not in self._derived:
+            import numpy as np
+            self._derived["sizes"] = np.array(self._sizes, dtype=np.int64)
+        return self._derived["sizes"]
+
+    def document_frequency(self):
+        if "frequency" not in self._derived:
+            import numpy as np
+            self._derived["frequency"] = np.bincount(self.matrix.indices, minlength=len(self.terms))
+        return self._derived["frequency"]
+
+    def tfidf(self):
+        """
+        TF-IDF weights with smoothed IDF and L2-normalized rows, the same
+        weighting scikit-learn's TfidfVectorizer uses by default.
+        """
+        if "tfidf" not in self._derived:
+            import numpy as np
+            from scipy import sparse
+
+            matrix = self.matrix
+            idf = np.log((1 + matrix.shape[0]) / (1 + self.document_frequency())) + 1
+            weights = matrix @ sparse.diags(idf)
+            norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+            norms[norms == 0] = 1
+            tfidf = sparse.csr_matrix(sparse.diags(1 / norms) @ weights)
+            tfidf.sort_indices()
+            self._derived["tfidf"] = tfidf
+        return self._derived["tfidf"]
+
+    def density(self, url, top=20):
+        """
+        The page's most frequent single-word terms, as a percentage of its terms.
+        """
+        import numpy as np
+
+        row = self.matrix.getrow(self._rows[url])
+        single = self._ngram_sizes()[row.indices] == 1
+        columns, counts = row.indices[single], row.data[single]
+        order = np.argsort(-counts, kind="stable")[:top]
+        length = self._lengths[self._rows[url]] or 1
+        return {self.terms[columns[i]]: float(counts[i] * 100 / length) for i in order}
+
+    def top_terms(self, url, top=10):
+        """
+        The terms (words or phrases) that distinguish the page from the rest of the site.
+        """
+        import numpy as np
+
+        row = self.tfidf().getrow(self._rows[url])
+        order = np.argsort(-row.data, kind="stable")[:top]
+        return {self.terms[row.indices[i]]: float(row.data[i]) for i in order}
+
+    def site_keywords(self, top=50):
+        """
+        Site-wide terms ranked by their summed TF-IDF weight, with the number
+        of pages using each.
+        """
+        import numpy as np
+
+        scores = np.asarray(self.tfidf().sum(axis=0)).ravel()
+        frequency = self.document_frequency()
+        order = np.argsort(-scores, kind="stable")[:top]
+        return [
+            {"Term": self.terms[i], "Score": float(scores[i]), "Pages": int(frequency[i])}
+            for i in order
+        ]
+
+    def ngrams(self, n=2, top=20, min_pages=2):
+        """
+        The most frequent n-word phrases used on at least min_pages pages.
+        """
+        import numpy as np
+
+        totals = np.asarray(self.matrix.sum(axis=0)).ravel()
+        frequency = self.document_frequency()
+        candidates = np.flatnonzero((self._ngram_sizes() == n) & (frequency >= min_pages))
+        order = candidates[np.argsort(-totals[candidates], kind="stable")[:top]]
+        return [
+            {"Phrase": self.terms[i], "Count": int(totals[i]), "Pages": int(frequency[i])}
+            for i in order
+        ]
+
+    def cannibalization(self, top_terms=5, min_pages=2):
+        """
+        Terms that are among the top_terms TF-IDF terms of at least min_pages
+        pages, i.e. pages competing for the same keyword. Maps each term to
+        its competing URLs, strongest page first.
+        """
+        import numpy as np
+        from scipy import sparse
+
+        tfidf = self.tfidf()
+        if not tfidf.nnz:
+            return {}
+        # Keep only each page's top terms: sort every entry by row, then by
+        # descending weight, and keep the first top_terms of each row
+        rows = np.repeat(np.arange(tfidf.shape[0]), np.diff(tfidf.indptr))
+        order = np.lexsort((-tfidf.data, rows))
+        rank = np.arange(len(order)) - tfidf.indptr[rows[order]]
+        keep = order[rank < top_terms]
+        best = sparse.csc_matrix((tfidf.data[keep], (rows[keep], tfidf.indices[keep])), shape=tfidf.shape)
+
+        competing = {}
+        for column in np.flatnonzero(np.diff(best.indptr) >= min_pages):
+            start, end = best.indptr[column], best.indptr[column + 1]
+            order = np.argsort(-best.data[start:end], kind="stable")
+            competing[self.terms[column]] = [self.urls[best.indices[start + i]] for i in order]
+        return competing
+
+
+def _optimize_image(data, output_base, max_size, quality, formats):
+    # Runs in a worker process: decode, shrink and re-encode one image,
+    # keeping whichever allowed format comes out smallest
+    from PIL import Image
+
+    with Image.open(BytesIO(data)) as img:
+        source_format = img.format
+        if getattr(img, 'is_animated', False):
+            return {"Skipped": "Animated images are left as they are"}
+        original_dimensions = img.size
+        # JPEGs can be decoded straight at 1/2, 1/4 or 1/8 scale
+        img.draft('RGB', max_size)
+        img.thumbnail(max_size)
+        dimensions = img.size
+        resized = dimensions != original_dimensions
+
+        transparent = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+        img = img.convert('RGBA' if transparent else 'RGB')
+
+        candidates = []
+        # JPEG has no alpha channel, so transparent images fall back to PNG
+        allowed = [output_format for output_format in formats if not (transparent and output_format == 'jpeg')]
+        for output_format in allowed or ['png']:
+            buffer = BytesIO()
+            if output_format == 'webp':
+                img.save(buffer, 'WEBP', quality=quality, method=4)
+            elif output_format == 'jpeg':
+                img.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+            else:
+                img.save(buffer, 'PNG', optimize=True)
+            candidates.append((buffer.getbuffer().nbytes, output_format, buffer))
+
+    size, output_format, buffer = min(candidates, key=lambda candidate: candidate[0])
+    if size >= len(data) and not resized:
+        # Nothing to gain; keep the original bytes under their own format
+        output_format, output = (source_format or 'bin').lower(), data
+    else:
+        output = buffer.getvalue()
+
+    path = f"{output_base}.{ImageOptimizer.EXTENSIONS.get(output_format, output_format)}"
+    with open(path, 'wb') as file:
+        file.write(output)
+    return {
+        "Output": path,
+        "Format": output_format.upper(),
+        "Dimensions": f"{dimensions[0]}x{dimensions[1]}",
+        "Optimized Size (KB)": len(output) / 1024,
+        "Bytes Saved": len(data) - len(output),
+    }
+
+
+class ImageOptimizer:
+    """
+    Shrink and re-encode images on a process pool. JPEGs are decoded in
+    draft mode at reduced scale, every image is resized to fit max_size and
+    saved in whichever of formats ('webp', 'jpeg', 'png') is smallest.
+    Sources whose content was already optimized with the same settings are
+    skipped, using a manifest of content hashes kept in output_dir.
+    """
+
+    EXTENSIONS = {'jpeg': 'jpg', 'webp': 'webp', 'png': 'png', 'gif': 'gif'}
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, output_dir, max_size=(1920, 1920), quality=80, formats=('webp', 'jpeg', 'png'),
+                 max_workers=None):
+        self.output_dir = output_dir
+        self.max_size = tuple(max_size)
+        self.quality = quality
+        self.formats = tuple(formats)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        os.makedirs(output_dir, exist_ok=True)
+        self._manifest_path = os.path.join(output_dir, self.MANIFEST)
+        self.manifest = {}
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path) as file:
+                self.manifest = json.load(file)
+
+    def optimize(self, images):
+        """
+        Optimize (source, bytes) pairs and yield one report per image as
+        workers finish. Only a few images per worker are held in memory.
+        """
+        settings = f"{self.max_size[0]}x{self.max_size[1]}:{self.quality}:{','.join(self.formats)}"
+        pending = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for source, data in images:
+                report = {"Source": source, "Original Size (KB)": len(data) / 1024}
+                digest = hashlib.sha256(data).hexdigest()
+                key = f"{digest}:{settings}"
+                done = self.manifest.get(key)
+                if done and os.path.exists(done["Output"]):
+                    yield {**report, **done, "Skipped": "Already optimized"}
+                    continue
+
+                stem = os.path.splitext(os.path.basename(urlparse(source).path.rstrip('/')))[0] or 'image'
+                output_base = os.path.join(self.output_dir, f"{stem}-{digest[:12]}")
+                future = executor.submit(_optimize_image, data, output_base, self.max_size,
+                                         self.quality, self.formats)
+                pending[future] = (key, report)
+                if len(pending) >= 2 * self.max_workers:
+                    yield from self._collect(pending, FIRST_COMPLETED)
+            yield from self._collect(pending, ALL_COMPLETED)
+        self._save_manifest()
+
+    def _collect(self, pending, return_when):
+        finished, _ = wait(pending, return_when=return_when)
+        for future in finished:
+            key, report = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"Error optimizing image {report['Source']}: {e}")
+                yield {**report, "error": str(e)}
+                continue
+            if "Output" in result:
+                self.manifest[key] = result
+            yield {**report, **result}
+
+    def _save_manifest(self):
+        with open(self._manifest_path, 'w') as file:
+            json.dump(self.manifest, file, indent=2)
+
+
+class SiteCrawler:
+    """
+    Crawl a site from a seed URL and analyze every internal page found.
+    Pages are discovered through each report's internal links (and optionally
+    the sitemap), filtered by robots.txt, and analyzed on a bounded worker pool
+    with a politeness delay between requests to the same host.
+
+    The delay (and any robots.txt Crawl-delay) only spaces out the page
+    fetches. Checks with the "network" requirement send further requests to
+    the host for every page (link checks, assets), so by default pages are
+    analyzed with the "content" profile, which has none.
+    """
+
+    def __init__(self, analyzer, max_pages=100, max_depth=3, max_workers=4, delay=1.0,
+                 max_frontier=10000, use_sitemap=False, respect_robots=True, sections=None, profile=None):
+        self.analyzer = analyzer
+        if sections is None and profile is None:
+            profile = "content"
+        # Internal links are always needed to discover further pages
+        self.sections = analyzer.select_checks(sections, profile)
+        if "Internal Links" not in self.sections:
+            self.sections = analyzer.select_checks(self.sections + ["Internal Links"])
+        network = [name for name in self.sections if "network" in CHECKS[name][0]]
+        if network:
+            logging.warning(f"Crawling with network checks, whose requests are not spaced by the delay: "
+                            f"{', '.join(network)}")
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.max_workers = max_workers
+        self.delay = delay
+        self.max_frontier = max_frontier
+        self.use_sitemap = use_sitemap
+        self.respect_robots = respect_robots
+        self.robots = None
+        self._next_request = {}  # Host -> earliest time of its next request
+        self._host_lock = threading.Lock()
+
+    def crawl(self, seed_url):
+        """
+        Yield one report per analyzed page, as soon as each page finishes.
+        """
+        site_url = normalize_url(urlunsplit(urlsplit(seed_url)[:2] + ('/', '', '')))
+        self._load_robots(seed_url)
+
+        frontier = deque([(normalize_url(seed_url), 0)])
+        seen = {normalize_url(seed_url)}
+        if self.use_sitemap:
+            for url in self.sitemap_urls(seed_url):
+                self._enqueue(frontier, seen, url, 1, site_url)
+
+        analyzed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while frontier or running:
+                while frontier and len(running) < self.max_workers and analyzed < self.max_pages:
+                    url, depth = frontier.popleft()
+                    if not self.allowed(url):
+                        logging.info(f"Skipping {url}: disallowed by robots.txt")
+                        continue
+                    running[executor.submit(self._analyze, url, site_url)] = (url, depth)
+                    analyzed += 1
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, depth = running.pop(future)
+                    try:
+                        report = future.result()
+                    except Exception as e:
+                        # One broken page must not end the crawl
+                        logging.error(f"Error analyzing {url}: {e}")
+                        report = {"URL": url, "error": str(e)}
+                    if depth < self.max_depth and "error" not in report:
+                        for link in report["Internal Links"]:
+                            self._enqueue(frontier, seen, link, depth + 1, site_url, base_url=url)
+                    yield report
+
+    def allowed(self, url):
+        if self.robots is None:
+            return True
+        return self.robots.can_fetch(self.analyzer.session.headers.get('User-Agent', '*'), url)
+
+    def sitemap_urls(self, seed_url):
+        """
+        Page URLs listed in the site's sitemaps (robots.txt Sitemap entries,
+        falling back to /sitemap.xml), following one level of sitemap index.
+        """
+        sitemaps = (self.robots.site_maps() if self.robots else None) or [
+            requests.compat.urljoin(seed_url, '/sitemap.xml')
+        ]
+        urls = []
+        for sitemap_url in sitemaps:
+            root = self._fetch_sitemap(sitemap_url)
+            if root is None:
+                continue
+            if root.tag.endswith('sitemapindex'):
+                for child_url in self._sitemap_locs(root):
+                    child = self._fetch_sitemap(child_url)
+                    if child is not None:
+                        urls.extend(self._sitemap_locs(child))
+            else:
+                urls.extend(self._sitemap_locs(root))
+        return urls
+
+    def _fetch_sitemap(self, sitemap_url):
+        try:
+            response = self.analyzer.session.get(sitemap_url)
+            response.raise_for_status()
+            return ElementTree.fromstring(response.content)
+        except (requests.exceptions.RequestException, ElementTree.ParseError) as e:
+            logging.warning(f"Could not read sitemap {sitemap_url}: {e}")
+            return None
+
+    def _sitemap_locs(self, root):
+        return [element.text.strip() for element in root.iter() if element.tag.endswith('loc') and element.text]
+
+    def _load_robots(self, seed_url):
+        if not self.respect_robots:
+            return
+        robots_txt = self.analyzer.check_robots_txt(seed_url)
+        if robots_txt in ("Not Found", "Error fetching"):
+            return
+        self.robots = RobotFileParser()
+        self.robots.parse(robots_txt.splitlines())
+        crawl_delay = self.robots.crawl_delay(self.analyzer.session.headers.get('User-Agent', '*'))
+        if crawl_delay:
+            self.delay = max(self.delay, float(crawl_delay))
+
+    def _enqueue(self, frontier, seen, url, depth, site_url, base_url=None):
+        try:
+            key = normalize_url(resolve_url(url, base_url) if base_url else url)
+        except ValueError:
+            logging.debug(f"Skipping invalid URL {url!r}")
+            return
+        if key in seen or not key.startswith(site_url):
+            return
+        if len(frontier) >= self.max_frontier:
+            logging.debug(f"Frontier full, dropping {url}")
+            return
+        seen.add(key)
+        frontier.append((key, depth))
+
+    def _analyze(self, url, site_url):
+        self._wait_for_host(urlsplit(url).netloc)
+        return self.analyzer.analyze_page_speed(url, site_url=site_url, sections=self.sections)
+
+    def _wait_for_host(self, host):
+        with self._host_lock:
+            now = time.monotonic()
+            start = max(now, self._next_request.get(host, now))
+            self._next_request[host] = start + self.delay
+        time.sleep(start - now)
+
+
+class MonitoringService:
+    """
+    Long-running monitor for a set of URLs, each with its own interval.
+    Checks are kept on a priority queue ordered by next due time and run
+    through continuous_monitoring on a bounded worker pool. A check that comes
+    due while the previous one for the same URL is still running, or while
+    max_pending checks are already in flight, is skipped and counted as missed
+    rather than queued.
+    """
+
+    def __init__(self, analyzer, max_workers=8, max_pending=None, jitter=0.1, tolerance=0.0,
+                 sections=None, profile=None):
+        self.analyzer = analyzer
+        self.sections = sections
+        self.profile = profile
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max_workers
+        self.jitter = jitter  # Random delay added to each run, as a fraction of the interval
+        self.tolerance = tolerance
+        self.metrics = Counter()
+        self._intervals = {}
+        # Bumped by every add() and remove(), so that queue entries of an
+        # earlier schedule for the URL are dropped instead of run
+        self._generations = Counter()
+        self._queue = []  # Heap of (run_at, sequence, url, scheduled_at, generation)
+        self._sequence = 0
+        self._running = set()
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+
+    def add(self, url, interval):
+        """
+        Monitor url every interval seconds, starting within one jitter window.
+        """
+        with self._condition:
+            self._intervals[url] = interval
+            self._generations[url] += 1
+            self._schedule(url, time.time())
+            self._condition.notify()
+
+    def remove(self, url):
+        with self._condition:
+            self._intervals.pop(url, None)
+            self._generations[url] += 1
+
+    def stop(self):
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def run(self, duration=None):
+        """
+        Run checks until stop() is called, or for duration seconds.
+        """
+        deadline = None if duration is None else time.time() + duration
+        self._stopped.clear()
+        # Created here, as the first checks would race to create it on the pool
+        if self.analyzer.metrics_store is None:
+            self.analyzer.metrics_store = MetricsStore()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not self._stopped.is_set():
+                if deadline is not None and time.time() >= deadline:
+                    break
+                job = self._next_job(deadline)
+                if job is not None:
+                    executor.submit(self._check, *job)
+
+    def _next_job(self, deadline):
+        with self._condition:
+            if not self._queue:
+                self._condition.wait(None if deadline is None else max(0, deadline - time.time()))
+                return None
+            run_at, _, url, scheduled_at, generation = self._queue[0]
+            now = time.time()
+            if run_at > now:
+                wait_for = run_at - now if deadline is None else min(run_at, deadline) - now
+                self._condition.wait(max(0, wait_for))
+                return None
+
+            heapq.heappop(self._queue)
+            if generation != self._generations[url]:
+                return None  # Removed or added again since it was scheduled
+            interval = self._intervals[url]
+
+            # Fixed-rate schedule; periods that have already passed are counted as missed
+            next_at = scheduled_at + interval
+            while next_at <= now:
+                next_at += interval
+                self._missed(url, "schedule fell behind")
+            self._schedule(url, next_at)
+
+            self.metrics["max_lag_seconds"] = max(self.metrics["max_lag_seconds"], now - run_at)
+            if url in self._running:
+                self._missed(url, "previous check still running")
+                return None
+            if len(self._running) >= self.max_pending:
+                self._missed(url, "worker pool saturated")
+                return None
+            self._running.add(url)
+            return url, interval
+
+    def _schedule(self, url, scheduled_at):
+        interval = self._intervals[url]
+        run_at = scheduled_at + random.uniform(0, self.jitter * interval)
+        self._sequence += 1
+        heapq.heappush(self._queue, (run_at, self._sequence, url, scheduled_at, self._generations[url]))
+
+    def _missed(self, url, reason):
+        self.metrics["checks_missed"] += 1
+        logging.warning(f"Missed monitoring check for {url}: {reason}")
+
+    def _check(self, url, interval):
+        start_time = time.time()
+        try:
+            changes = self.analyzer.continuous_monitoring(
+                url, tolerance=self.tolerance, sections=self.sections, profile=self.profile
+            )
+        except Exception:
+            logging.exception(f"Monitoring check crashed for {url}")
+            changes = None
+        duration = time.time() - start_time
+
+        with self._condition:
+            self._running.discard(url)
+            self.metrics["checks_run"] += 1
+            if changes is None:
+                self.metrics["checks_failed"] += 1
+            elif changes:
+                self.metrics["changes_detected"] += 1
+            if duration > interval:
+                self.metrics["checks_slow"] += 1
+                logging.warning(f"Slow monitoring check for {url}: {duration:.1f}s exceeds its {interval}s interval")
+            self._condition.notify()
+
+
+def _numpy():
+    # NumPy values can only show up once something has imported NumPy
+    return sys.modules.get('numpy')
+
+
+class SEOJSONEncoder(json.JSONEncoder):
+    """
+    JSON encoder that understands the NumPy scalars and arrays found in reports.
+    """
+
+    def default(self, o):
+        np = _numpy()
+        if np is not None:
+            if isinstance(o, np.integer):
+                return int(o)
+            if isinstance(o, np.floating):
+                return float(o)
+            if isinstance(o, np.bool_):
+                return bool(o)
+            if isinstance(o, np.ndarray):
+                return o.tolist()
+        if isinstance(o, (set, frozenset)):
+            return list(o)
+        return super().default(o)
+
+
+class ReportWriter:
+    """
+    Stream reports as JSON Lines: one compact line per page, flushed as soon
+    as it is written. Paths ending in .gz (or compress=True) are gzipped and
+    '-' writes to stdout. An existing file is replaced unless append=True.
+    """
+
+    def __init__(self, path, compress=None, append=False):
+        self.path = path
+        self._lock = threading.Lock()
+        mode = 'a' if append else 'w'
+        if path == '-':
+            self._file = sys.stdout
+        elif compress or (compress is None and str(path).endswith('.gz')):
+            self._file = gzip.open(path, mode + 't', encoding='utf-8')
+        else:
+            self._file = open(path, mode, encoding='utf-8')
+
+    def write(self, report):
+        line = json.dumps(report, cls=SEOJSONEncoder, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MetricsStore:
+    """
+    Append-only time series of page metrics, one row per URL and sample time,
+    kept in SQLite. WAL mode and a busy timeout let several monitors write to
+    the same database at once.
+    """
+
+    METRICS = {
+        "Total Load Time (seconds)": "load_time",
+        "Server Response Time (seconds)": "response_time",
+        "Page Size (KB)": "page_size",
+        "Performance Score": "performance_score",
+    }
+
+    def __init__(self, db_path='historical_data.db', keep_reports=False, timeout=30):
+        self.db_path = db_path
+        self.keep_reports = keep_reports  # Also store the full report JSON with each sample
+        self.timeout = timeout
+        self._local = threading.local()
+        db = self._connection()
+        db.execute("PRAGMA journal_mode=WAL")
+        with db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                "url TEXT NOT NULL, ts REAL NOT NULL, load_time REAL, response_time REAL, "
+                "page_size REAL, performance_score REAL, report TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS samples_url_ts ON samples (url, ts)")
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.db_path, timeout=self.timeout)
+        return db
+
+    def append(self, url, report, timestamp=None):
+        row = [url, time.time() if timestamp is None else timestamp]
+        row.extend(report.get(metric) for metric in self.METRICS)
+        row.append(json.dumps(report, cls=SEOJSONEncoder) if self.keep_reports else None)
+        with self._connection() as db:
+            db.execute("INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+
+    def latest(self, url, before=None):
+        """
+        The most recent sample for url, optionally strictly before a timestamp.
+        """
+        samples = self.history(url, end=before, limit=1, newest_first=True)
+        return samples[0] if samples else None
+
+    def history(self, url, start=None, end=None, limit=None, newest_first=False):
+        """
+        Samples for url with start <= timestamp < end, oldest first by default.
+        """
+        query = "SELECT ts, load_time, response_time, page_size, performance_score, report FROM samples WHERE url = ?"
+        params = [url]
+        if start is not None:
+            query += " AND ts >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND ts < ?"
+            params.append(end)
+        query += " ORDER BY ts DESC" if newest_first else " ORDER BY ts"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [self._sample(row) for row in self._connection().execute(query, params)]
+
+    def urls(self):
+        return [row[0] for row in self._connection().execute("SELECT DISTINCT url FROM samples ORDER BY url")]
+
+    def _sample(self, row):
+        sample = {"Timestamp": row[0]}
+        sample.update(zip(self.METRICS, row[1:5]))
+        if row[5] is not None:
+            sample["Report"] = json.loads(row[5])
+        return sample
+
+    def record(self, url, report, timestamp=None, tolerance=0.0):
+        """
+        Append a sample and return the metrics that changed since they were
+        last measured, as {metric: (previous, current)}. tolerance is the
+        relative change below which a metric counts as unchanged.
+        """
+        previous = self.last_measured(url)
+        self.append(url, report, timestamp)
+        return self.detect_changes(previous, report, tolerance)
+
+    def last_measured(self, url):
+        """
+        The most recent non-null value of every metric for url. Metrics can be
+        missing from a sample, e.g. load time and page size after a head-only
+        fetch, so these may come from different samples.
+        """
+        measured = {}
+        db = self._connection()
+        for metric, column in self.METRICS.items():
+            row = db.execute(
+                f"SELECT {column} FROM samples WHERE url = ? AND {column} IS NOT NULL ORDER BY ts DESC LIMIT 1",
+                (url,),
+            ).fetchone()
+            if row is not None:
+                measured[metric] = row[0]
+        return measured
+
+    def detect_changes(self, previous, current, tolerance=0.0):
+        changes = {}
+        for metric in self.METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if new is None:
+                continue  # Not measured this time, which is no change
+            if old is None:
+                if previous:
+                    changes[metric] = (old, new)
+            elif abs(new - old) > tolerance * abs(old):
+                changes[metric] = (old, new)
+        return changes
+
+    def import_json(self, path='historical_data.json', timestamp=None):
+        """
+        Import the snapshots kept by older versions in historical_data.json.
+        """
+        with open(path, 'r') as file:
+            for url, metrics in json.load(file).items():
+                self.append(url, metrics, timestamp)
+
+    def close(self):
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
 def convert_to_standard(data): 
-    if isinstance(data, np.integer):  # Check for NumPy integer types 
+    np = _numpy()
+    if np is not None and isinstance(data, np.integer):  # Check for NumPy integer types 
         return int(data) 
-    elif isinstance(data, (float, np.float64)):  # Use built-in float and np.float64 for NumPy floats 
+    elif isinstance(data, float) or (np is not None and isinstance(data, np.float64)):  # Use built-in float and np.float64 for NumPy floats 
         return float(data) 
     elif isinstance(data, list): 
         return [convert_to_standard(item) for item in data] 
@@ -526,16 +2623,61 @@ def convert_to_standard(data):
         return {key: convert_to_standard(value) for key, value in data.items()} 
     return data 
  
-# Example usage 
-analyzer = SEOAnalyzer()
-url = 'https://example.com/'
-report = analyzer.analyze_page_speed(url)
+def main():
+    parser = argparse.ArgumentParser(description="Analyze the SEO of a page or crawl a whole site.")
+    parser.add_argument('url', nargs='?', default='https://example.com/')
+    parser.add_argument('--crawl', action='store_true', help="crawl internal pages starting from url")
+    parser.add_argument('--profile', choices=sorted(PROFILES),
+                        help="only compute the sections of this profile (crawls default to 'content')")
+    parser.add_argument('--sections', type=lambda value: [name.strip() for name in value.split(',')],
+                        help="comma-separated report sections to compute")
+    parser.add_argument('--max-pages', type=int, default=100)
+    parser.add_argument('--max-depth', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--delay', type=float, default=1.0, help="seconds between requests to the same host")
+    parser.add_argument('--sitemap', action='store_true', help="also seed the crawl from sitemap.xml")
+    parser.add_argument('--output', default='report.jsonl',
+                        help="JSON Lines file for crawl reports ('-' for stdout, .gz to compress)")
+    parser.add_argument('--append', action='store_true', help="append to --output instead of replacing it")
+    parser.add_argument('--monitor', metavar='FILE',
+                        help="monitor the URLs listed in FILE, one 'url [interval]' per line")
+    parser.add_argument('--interval', type=float, default=3600, help="default monitoring interval in seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    analyzer = SEOAnalyzer()
+    if args.monitor:
+        service = MonitoringService(analyzer, max_workers=args.workers, sections=args.sections, profile=args.profile)
+        with open(args.monitor) as file:
+            for line in file:
+                fields = line.split()
+                if fields and not fields[0].startswith('#'):
+                    service.add(fields[0], float(fields[1]) if len(fields) > 1 else args.interval)
+        try:
+            service.run()
+        except KeyboardInterrupt:
+            service.stop()
+        return
+
+    if args.crawl:
+        crawler = SiteCrawler(analyzer, max_pages=args.max_pages, max_depth=args.max_depth,
+                              max_workers=args.workers, delay=args.delay, use_sitemap=args.sitemap,
+                              sections=args.sections, profile=args.profile)
+        # One line per page as soon as it is analyzed
+        with ReportWriter(args.output, append=args.append) as writer:
+            for report in crawler.crawl(args.url):
+                writer.write(report)
+        return
+
+    report = analyzer.analyze_page_speed(args.url, sections=args.sections, profile=args.profile)
+    output = json.dumps(report, indent=2, cls=SEOJSONEncoder)
+
+    print(output)
 
-# Convert report to a JSON-serializable format
-report = convert_to_standard(report)
+    # Save the report to a text file
+    with open('report.txt', 'w') as file:
+        file.write(output)
 
-print(json.dumps(report, indent=2))
 
-# Save the report to a text file
-with open('report.txt', 'w') as file:
-    file.write(json.dumps(report, indent=2))
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Headless chart rendering for SEOAnalyzer.
+
+Charts are drawn with matplotlib's object-oriented Figure API on the Agg
+canvas, so no display, pyplot state or GUI event loop is involved. Trend
+charts for many URLs are rendered from a MetricsStore on a process pool:
+
+    python seorender.py --db historical_data.db --output charts --format png --format svg
+
+Each worker process draws every chart on one reused TrendChart, which keeps
+memory flat however many charts are rendered.
+"""
+import argparse
+import hashlib
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter, date2num
+from matplotlib.figure import Figure
+
+from seoanalyzer import MetricsStore
+
+# State of a worker process, set up once by _init_worker
+_worker = {}
+
+
+def new_figure(size=(10, 6), dpi=100):
+    """
+    A Figure attached to an Agg canvas. Unlike pyplot figures it is not
+    registered anywhere, so it is freed as soon as it is no longer referenced.
+    """
+    figure = Figure(figsize=size, dpi=dpi)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def render_scores(current_scores, historical_scores, path, figure=None):
+    """
+    Draw current against historical scores per metric and save the chart to path.
+    """
+    figure = figure or new_figure()
+    figure.clear()
+    labels = list(current_scores.keys())
+    x = range(len(labels))
+
+    axes = figure.subplots()
+    axes.plot(x, list(current_scores.values()), marker='o', label='Current')
+    axes.plot(x, list(historical_scores.values()), marker='x', label='Historical')
+    axes.set_xticks(x, labels)
+    axes.set_xlabel('Metrics')
+    axes.set_ylabel('Scores')
+    axes.set_title('SEO Scores Comparison')
+    axes.legend()
+    axes.grid()
+
+    figure.savefig(path)
+    figure.clear()
+    return path
+
+
+class TrendChart:
+    """
+    A reusable chart with one panel per metric over time. The figure, axes,
+    ticks and lines are built once; drawing another URL only replaces the
+    line data and the title, which is much cheaper than a fresh figure.
+    """
+
+    def __init__(self, metrics=None, size=(10, 6), dpi=100):
+        self.metrics = list(metrics or MetricsStore.METRICS)
+        self.figure = new_figure(size, dpi)
+        self.title = self.figure.suptitle('', fontsize='medium')
+
+        columns = 2 if len(self.metrics) > 1 else 1
+        rows = -(-len(self.metrics) // columns)
+        panels = self.figure.subplots(rows, columns, sharex=True, squeeze=False).ravel()
+        locator = AutoDateLocator(minticks=3, maxticks=6)
+        self.lines = []
+        for panel, metric in zip(panels, self.metrics):
+            line, = panel.plot([], [], marker='.', linewidth=1)
+            self.lines.append(line)
+            panel.set_title(metric, fontsize='small')
+            panel.grid(alpha=0.3)
+            panel.xaxis.set_major_locator(locator)
+            panel.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+        for panel in panels[len(self.metrics):]:
+            panel.set_visible(False)
+
+    def render(self, url, samples, paths):
+        """
+        Draw MetricsStore samples of url and save the chart to every path
+        (the extension picks PNG, SVG, ...).
+        """
+        for line, metric in zip(self.lines, self.metrics):
+            points = [(sample["Timestamp"], sample[metric]) for sample in samples if sample.get(metric) is not None]
+            times, values = zip(*points) if points else ((), ())
+            line.set_data(date2num([datetime.fromtimestamp(when) for when in times]), values)
+            line.axes.relim()
+            line.axes.autoscale_view()
+            if not points:
+                line.axes.set_ylim(0, 1, auto=True)  # Otherwise the previous URL's limits stay
+        self.title.set_text(url)
+
+        for path in paths:
+            self.figure.savefig(path)
+        return paths
+
+
+def chart_name(url):
+    # Readable and unique file name for a URL's chart
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', url.split('://', 1)[-1]).strip('_')[:80]
+    return f"{slug}-{hashlib.sha1(url.encode()).hexdigest()[:8]}"
+
+
+def _init_worker(db_path, output_dir, formats, metrics, since, size, dpi):
+    # sqlite3 connections cannot cross processes, so each worker opens its own
+    _worker.update(
+        store=MetricsStore(db_path),
+        chart=TrendChart(metrics, size, dpi),
+        output_dir=output_dir,
+        formats=formats,
+        since=since,
+    )
+
+
+def _render_url(url):
+    try:
+        samples = _worker["store"].history(url, start=_worker["since"])
+        if not samples:
+            return url, None
+        base = os.path.join(_worker["output_dir"], chart_name(url))
+        paths = [f"{base}.{extension}" for extension in _worker["formats"]]
+        return url, _worker["chart"].render(url, samples, paths)
+    except Exception as e:
+        logging.error(f"Error rendering chart for {url}: {e}")
+        return url, None
+
+
+class ChartRenderer:
+    """
+    Render a trend chart per URL from a MetricsStore database on a pool of
+    worker processes. Workers are replaced after max_tasks_per_child charts
+    so that no cache inside matplotlib can grow without bound; this makes the
+    pool spawn its workers, so scripts calling render() need the usual
+    if __name__ == "__main__" guard.
+    """
+
+    def __init__(self, db_path='historical_data.db', output_dir='charts', formats=('png',), metrics=None,
+                 days=None, max_workers=None, size=(10, 6), dpi=100, max_tasks_per_child=500):
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.formats = tuple(formats)
+        self.metrics = list(metrics or MetricsStore.METRICS)
+        self.days = days  # Only plot the last days of samples; None plots everything
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.size = size
+        self.dpi = dpi
+        self.max_tasks_per_child = max_tasks_per_child
+
+    def render(self, urls=None):
+        """
+        Render the charts of urls (every URL in the store by default) and
+        return {url: [paths]}; URLs without samples map to None.
+        """
+        if urls is None:
+            store = MetricsStore(self.db_path)
+            urls = store.urls()
+            store.close()
+        urls = list(urls)
+        os.makedirs(self.output_dir, exist_ok=True)
+        since = time.time() - self.days * 86400 if self.days else None
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.db_path, self.output_dir, self.formats, self.metrics, since, self.size, self.dpi),
+            max_tasks_per_child=self.max_tasks_per_child,
+        ) as executor:
+            chunksize = max(1, min(64, len(urls) // (self.max_workers * 4)))
+            return dict(executor.map(_render_url, urls, chunksize=chunksize))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render SEO metric trend charts from a metrics database.")
+    parser.add_argument('urls', nargs='*', help="URLs to chart (default: every URL in the database)")
+    parser.add_argument('--db', default='historical_data.db', help="MetricsStore SQLite database")
+    parser.add_argument('--output', default='charts', help="directory for the chart files")
+    parser.add_argument('--format', action='append', choices=['png', 'svg', 'pdf'],
+                        help="output format, may be repeated (default: png)")
+    parser.add_argument('--days', type=float, help="only plot samples from the last DAYS days")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    renderer = ChartRenderer(args.db, args.output, formats=args.format or ['png'], days=args.days,
+                             max_workers=args.workers)
+    charts = renderer.render(args.urls or None)
+    rendered = sum(1 for paths in charts.values() if paths)
+    logging.info(f"Rendered {rendered} of {len(charts)} charts to {args.output}")
+
+
+if __name__ == "__main__":
+    main()